@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 """A github org client
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
+    Any,
     List,
     Dict,
+    AsyncIterator,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
 )
 
 from utils import (
     get_json,
+    get_json_async,
+    get_json_pages,
+    get_json_pages_async,
     access_nested_map,
+    async_memoize,
+    get_rate_limiter,
     memoize,
+    RateLimiter,
 )
 
 
@@ -18,24 +31,33 @@ class GithubOrgClient:
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
 
-    def __init__(self, org_name: str) -> None:
-        """Init method of GithubOrgClient"""
+    def __init__(self, org_name: str, limiter: Optional[Any] = None) -> None:
+        """Init method of GithubOrgClient
+        Requests wait for limiter (a RateLimiter) if given, else for the
+        one installed with set_rate_limiter, if any.
+        """
         self._org_name = org_name
+        self._limiter = limiter
 
     @memoize
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        return get_json(self.ORG_URL.format(org=self._org_name),
+                        limiter=self._limiter)
 
     @property
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
 
+    def iter_repos(self) -> Iterator[Dict]:
+        """Stream repos from every page of the repos URL"""
+        return get_json_pages(self._public_repos_url, limiter=self._limiter)
+
     @memoize
-    def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+    def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload (all pages)"""
+        return list(self.iter_repos())
 
     def public_repos(self, license: str = None) -> List[str]:
         """Public repos"""
@@ -57,3 +79,82 @@ class GithubOrgClient:
         except KeyError:
             return False
         return has_license
+
+
+def public_repos_for_orgs(
+    org_names: Sequence[str], license: str = None, max_workers: int = 8,
+    rate_limiter: Optional[RateLimiter] = None
+) -> Dict[str, Union[List[str], Exception]]:
+    """Run GithubOrgClient(org).public_repos(license) for many orgs.
+    Orgs are processed on max_workers threads, and every request waits
+    for one rate limiter (rate_limiter if given, else the installed
+    one, else a new RateLimiter) that is passed to each client, so
+    other callers and concurrent batches are not affected. The limiter
+    follows the X-RateLimit headers of the responses.
+    Returns
+    -------
+    A dict mapping each org name to its list of repo names, or to the
+    exception raised while fetching it
+    """
+    limiter = rate_limiter or get_rate_limiter() or RateLimiter()
+
+    def audit(org_name: str) -> Union[List[str], Exception]:
+        """public_repos for one org, returning instead of raising errors"""
+        try:
+            return GithubOrgClient(org_name, limiter).public_repos(license)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(org_names, executor.map(audit, org_names)))
+
+
+class AsyncGithubOrgClient(GithubOrgClient):
+    """An asyncio Github org client
+    Same surface as GithubOrgClient, but org, repos_payload and
+    public_repos are awaitable. All clients share the aiohttp session
+    and the optional limiter (e.g. asyncio.Semaphore) they are given:
+
+    async with aiohttp.ClientSession() as session:
+        limiter = asyncio.Semaphore(20)
+        clients = [AsyncGithubOrgClient(org, session, limiter)
+                   for org in orgs]
+        results = await asyncio.gather(
+            *(c.public_repos(license="mit") for c in clients))
+    """
+
+    def __init__(self, org_name: str, session: Any,
+                 limiter: Optional[Any] = None) -> None:
+        """Init method of AsyncGithubOrgClient"""
+        super().__init__(org_name, limiter)
+        self._session = session
+
+    @async_memoize
+    async def org(self) -> Dict:
+        """Memoize org"""
+        return await get_json_async(self.ORG_URL.format(org=self._org_name),
+                                    self._session, self._limiter)
+
+    @property
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org)["repos_url"]
+
+    async def iter_repos(self) -> AsyncIterator[Dict]:
+        """Stream repos from every page of the repos URL"""
+        async for repo in get_json_pages_async(await self._public_repos_url,
+                                               self._session, self._limiter):
+            yield repo
+
+    @async_memoize
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload (all pages)"""
+        return [repo async for repo in self.iter_repos()]
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        json_payload = await self.repos_payload
+        return [
+            repo["name"] for repo in json_payload
+            if license is None or self.has_license(repo, license)
+        ]
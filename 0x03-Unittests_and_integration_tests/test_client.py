@@ -3,9 +3,14 @@
 
 import unittest
 from typing import Dict
-from unittest.mock import patch, PropertyMock
+from unittest.mock import patch, AsyncMock, PropertyMock
 from parameterized import parameterized
-from client import GithubOrgClient
+from client import (
+    AsyncGithubOrgClient,
+    GithubOrgClient,
+    public_repos_for_orgs,
+)
+from utils import RateLimiter, get_rate_limiter
 
 
 class TestGithubOrgClient(unittest.TestCase):
@@ -35,7 +40,7 @@ class TestGithubOrgClient(unittest.TestCase):
 
         self.assertEqual(result, expected_payload)
         mock_get_json.assert_called_once_with(
-            f"https://api.github.com/orgs/{org_name}"
+            f"https://api.github.com/orgs/{org_name}", limiter=None
         )
 
     def test_public_repos_url(self) -> None:
@@ -58,22 +63,23 @@ class TestGithubOrgClient(unittest.TestCase):
 
         self.assertEqual(result, fake_repos_url)
 
-    @patch("client.get_json")
-    def test_public_repos(self, mock_get_json: unittest.mock.Mock) -> None:
+    @patch("client.get_json_pages")
+    def test_public_repos(self,
+                          mock_get_json_pages: unittest.mock.Mock) -> None:
         """
         Test GithubOrgClient.public_repos returns the expected list of
         repository names based on a mocked payload.
 
         Args:
-            mock_get_json (Mock): Mocked get_json function.
+            mock_get_json_pages (Mock): Mocked get_json_pages function.
         """
-        # Mocked repos payload returned by get_json
+        # Mocked repos streamed by get_json_pages
         mocked_repos_payload = [
             {"name": "repo1", "license": {"key": "mit"}},
             {"name": "repo2", "license": {"key": "apache-2.0"}},
             {"name": "repo3", "license": None},
         ]
-        mock_get_json.return_value = mocked_repos_payload
+        mock_get_json_pages.return_value = iter(mocked_repos_payload)
 
         fake_repos_url = "https://api.github.com/orgs/test-org/repos"
 
@@ -94,8 +100,9 @@ class TestGithubOrgClient(unittest.TestCase):
         # Ensure _public_repos_url property was called once
         mock_public_repos_url.assert_called_once()
 
-        # Ensure get_json was called once with the fake repos URL
-        mock_get_json.assert_called_once_with(fake_repos_url)
+        # Ensure get_json_pages was called once with the fake repos URL
+        mock_get_json_pages.assert_called_once_with(fake_repos_url,
+                                                    limiter=None)
 
     parameterized.expand([
         (
@@ -126,5 +133,89 @@ class TestGithubOrgClient(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class TestPublicReposForOrgs(unittest.TestCase):
+    """Unit tests for the multi-org public_repos_for_orgs batch API."""
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_public_repos_for_orgs(self, mock_get_json: unittest.mock.Mock,
+                                   mock_pages: unittest.mock.Mock) -> None:
+        """
+        Test that every org gets its own result, failures are returned
+        per org and the given rate limiter is passed to every request
+        without being installed process-wide.
+        """
+        seen_limiters = []
+
+        def org_payload(url, limiter=None):
+            seen_limiters.append(limiter)
+            if url.endswith("/broken"):
+                raise ValueError("broken org")
+            return {"repos_url": url + "/repos"}
+
+        def repos_pages(url, limiter=None):
+            seen_limiters.append(limiter)
+            return iter([{"name": url.split("/")[-2] + "-repo",
+                          "license": {"key": "mit"}}])
+        mock_get_json.side_effect = org_payload
+        mock_pages.side_effect = repos_pages
+        limiter = RateLimiter()
+
+        results = public_repos_for_orgs(["google", "abc", "broken"],
+                                        license="mit", max_workers=2,
+                                        rate_limiter=limiter)
+
+        self.assertEqual(results["google"], ["google-repo"])
+        self.assertEqual(results["abc"], ["abc-repo"])
+        self.assertIsInstance(results["broken"], ValueError)
+        self.assertEqual(seen_limiters, [limiter] * 5)
+        self.assertIsNone(get_rate_limiter())
+
+
+class TestAsyncGithubOrgClient(unittest.IsolatedAsyncioTestCase):
+    """Unit tests for the awaitable AsyncGithubOrgClient."""
+
+    @patch("client.get_json_async", new_callable=AsyncMock)
+    async def test_org(self, mock_get_json_async: AsyncMock) -> None:
+        """
+        Test that awaiting org twice fetches the org URL once with the
+        shared session and limiter.
+        """
+        mock_get_json_async.return_value = {"login": "google"}
+        session, limiter = object(), object()
+        client = AsyncGithubOrgClient("google", session, limiter)
+
+        self.assertEqual(await client.org, {"login": "google"})
+        self.assertEqual(await client.org, {"login": "google"})
+        mock_get_json_async.assert_awaited_once_with(
+            "https://api.github.com/orgs/google", session, limiter)
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json_pages_async")
+    @patch("client.get_json_async", new_callable=AsyncMock)
+    async def test_public_repos(self, mock_get_json_async: AsyncMock,
+                                mock_pages_async: unittest.mock.Mock,
+                                mock_pages: unittest.mock.Mock) -> None:
+        """
+        Test that public_repos streams every repo from the org's repos
+        URL and filters them by license, without sync HTTP calls.
+        """
+        repos_url = "https://api.github.com/orgs/google/repos"
+        mock_get_json_async.return_value = {"repos_url": repos_url}
+
+        async def pages(url, session, limiter):
+            for repo in [{"name": "repo1", "license": {"key": "mit"}},
+                         {"name": "repo2", "license": None}]:
+                yield repo
+        mock_pages_async.side_effect = pages
+
+        client = AsyncGithubOrgClient("google", session=None)
+
+        self.assertEqual(await client.public_repos(), ["repo1", "repo2"])
+        self.assertEqual(await client.public_repos("mit"), ["repo1"])
+        mock_pages_async.assert_called_once_with(repos_url, None, None)
+        mock_pages.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
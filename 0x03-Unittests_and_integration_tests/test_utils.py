@@ -1,11 +1,28 @@
 #!/usr/bin/env python3
 """Unit tests for utils module functions."""
 
+import asyncio
+import json
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Tuple, Dict
 from unittest.mock import patch, Mock
 from parameterized import parameterized
-from utils import access_nested_map, get_json, memoize
+import aiohttp
+import utils
+from utils import (
+    access_nested_map,
+    get_json,
+    get_json_pages,
+    get_json_pages_async,
+    get_session,
+    async_memoize,
+    memoize,
+    RateLimiter,
+)
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -65,13 +82,162 @@ class TestGetJson(unittest.TestCase):
         """
         mock_response = Mock()
         mock_response.json.return_value = test_payload
+        mock_session = Mock()
+        mock_session.get.return_value = mock_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("utils.get_session", return_value=mock_session):
             result = get_json(test_url)
-            mock_get.assert_called_once_with(test_url)
+            mock_session.get.assert_called_once_with(
+                test_url, timeout=utils.DEFAULT_TIMEOUT, headers={})
             self.assertEqual(result, test_payload)
 
 
+class JSONHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the GitHub API that records client ports."""
+
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+    statuses = []
+
+    def do_GET(self) -> None:
+        """
+        Answer every GET with a small JSON body tagged with an ETag,
+        or with 304 when the client already holds that ETag.
+        """
+        self.client_ports.append(self.client_address[1])
+        if self.path.startswith("/repos"):
+            self.send_repos_page()
+            return
+        etag = '"{}"'.format(self.path)
+        if self.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.statuses.append(200)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_repos_page(self) -> None:
+        """
+        Serve /repos?page=N (3 pages of 2 repos) with GitHub style Link
+        headers; /repos_next links only to the next page.
+        """
+        path, _, query = self.path.partition("?")
+        page = int(query.split("=")[1]) if query else 1
+        base = "http://127.0.0.1:{}{}".format(self.server.server_port, path)
+        links = []
+        if page < 3:
+            links.append('<{}?page={}>; rel="next"'.format(base, page + 1))
+            if path == "/repos":
+                links.append('<{}?page=3>; rel="last"'.format(base))
+        body = json.dumps([{"name": "repo{}".format(2 * page - i)}
+                           for i in (1, 0)]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if links:
+            self.send_header("Link", ", ".join(links))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+class TestGetJsonSession(unittest.TestCase):
+    """Test get_json against a local HTTP server."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Start the stand-in server on a free port."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), JSONHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+        cls.base_url = "http://127.0.0.1:{}".format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stop the stand-in server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_get_json_reuses_connection(self) -> None:
+        """
+        Test that consecutive get_json calls return the payload and
+        share one keep-alive connection.
+        """
+        JSONHandler.client_ports.clear()
+        first = get_json(self.base_url + "/orgs/google")
+        second = get_json(self.base_url + "/orgs/abc")
+
+        self.assertEqual(first, {"path": "/orgs/google"})
+        self.assertEqual(second, {"path": "/orgs/abc"})
+        self.assertEqual(len(set(JSONHandler.client_ports)), 1)
+
+    def test_get_json_revalidates_cache(self) -> None:
+        """
+        Test that with a cache directory the second fetch of a URL is a
+        conditional request answered with 304 from the cached body.
+        """
+        JSONHandler.statuses.clear()
+        url = self.base_url + "/orgs/cached"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            utils.set_cache_dir(cache_dir)
+            try:
+                first = get_json(url)
+                second = get_json(url)
+            finally:
+                utils.set_cache_dir(None)
+
+        self.assertEqual(first, {"path": "/orgs/cached"})
+        self.assertEqual(second, first)
+        self.assertEqual(JSONHandler.statuses, [200, 304])
+
+    @parameterized.expand([
+        ("/repos",),
+        ("/repos_next",),
+    ])
+    def test_get_json_pages(self, path: str) -> None:
+        """
+        Test that get_json_pages yields the repos of every page in order,
+        whether it prefetches up to rel="last" or follows rel="next".
+        """
+        repos = list(get_json_pages(self.base_url + path))
+        self.assertEqual([repo["name"] for repo in repos],
+                         ["repo{}".format(i) for i in range(1, 7)])
+
+    @parameterized.expand([
+        ("/repos",),
+        ("/repos_next",),
+    ])
+    def test_get_json_pages_async(self, path: str) -> None:
+        """
+        Test that get_json_pages_async yields the same repos as the sync
+        version over an aiohttp session.
+        """
+        async def collect():
+            async with aiohttp.ClientSession() as session:
+                limiter = asyncio.Semaphore(2)
+                return [repo["name"] async for repo in get_json_pages_async(
+                    self.base_url + path, session, limiter)]
+
+        self.assertEqual(asyncio.run(collect()),
+                         ["repo{}".format(i) for i in range(1, 7)])
+
+    def test_get_session_is_shared(self) -> None:
+        """Test that get_session always returns the same session."""
+        self.assertIs(get_session(), get_session())
+
+
 class TestMemoize(unittest.TestCase):
     """Test cases for the memoize decorator."""
 
@@ -108,5 +274,94 @@ class TestMemoize(unittest.TestCase):
             mock_method.assert_called_once()
 
 
+class TestAsyncMemoize(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the async_memoize decorator."""
+
+    async def test_failed_call_not_cached(self) -> None:
+        """
+        Test that a call that raised is retried on the next access,
+        and that its successful result is then cached.
+        """
+        calls = []
+
+        class TestClass:
+            """Test class to use async_memoize decorator."""
+
+            @async_memoize
+            async def a_property(self) -> int:
+                """Fails on the first call, returns 42 afterwards."""
+                calls.append(1)
+                if len(calls) == 1:
+                    raise ConnectionError("boom")
+                return 42
+
+        test_obj = TestClass()
+        with self.assertRaises(ConnectionError):
+            await test_obj.a_property
+        self.assertEqual(await test_obj.a_property, 42)
+        self.assertEqual(await test_obj.a_property, 42)
+        self.assertEqual(len(calls), 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the RateLimiter token bucket."""
+
+    def test_acquire_within_burst(self) -> None:
+        """Test that up to burst requests go through without waiting."""
+        limiter = RateLimiter(rate=1, burst=3)
+        with patch("utils.time.sleep") as mock_sleep:
+            for _ in range(3):
+                limiter.acquire()
+        mock_sleep.assert_not_called()
+
+    def test_acquire_waits_for_reset(self) -> None:
+        """
+        Test that when the server reports no requests remaining,
+        acquire waits until X-RateLimit-Reset.
+        """
+        limiter = RateLimiter(rate=1000, burst=5)
+        limiter.update({"X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": str(time.time() + 0.2)})
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_secondary_limit_retried_once(self) -> None:
+        """
+        Test that a 403 response carrying Retry-After is retried once
+        after the pause, and the retried payload is returned.
+        """
+        limited = Mock(status_code=403, headers={"Retry-After": "0"})
+        limited.json.return_value = {"message": "secondary rate limit"}
+        ok = Mock(status_code=200, headers={}, links={})
+        ok.json.return_value = {"payload": True}
+        mock_session = Mock()
+        mock_session.get.side_effect = [limited, ok]
+        self.addCleanup(utils.set_rate_limiter, None)
+        utils.set_rate_limiter(RateLimiter())
+
+        with patch("utils.get_session", return_value=mock_session):
+            self.assertEqual(get_json("http://example.com"),
+                             {"payload": True})
+        self.assertEqual(mock_session.get.call_count, 2)
+
+    def test_explicit_limiter(self) -> None:
+        """
+        Test that a limiter passed to get_json is used without being
+        installed process-wide.
+        """
+        ok = Mock(status_code=200, headers={"X-RateLimit-Remaining": "0"},
+                  links={})
+        ok.json.return_value = {"payload": True}
+        mock_session = Mock()
+        mock_session.get.return_value = ok
+        limiter = RateLimiter(rate=1, burst=3)
+
+        with patch("utils.get_session", return_value=mock_session):
+            get_json("http://example.com", limiter=limiter)
+        self.assertEqual(limiter._tokens, 0)
+        self.assertIsNone(utils.get_rate_limiter())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,22 +1,69 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
 import requests
 from functools import wraps
 from typing import (
     Mapping,
     Sequence,
     Any,
+    AsyncIterator,
     Dict,
     Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
 )
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import (
+    parse_qs,
+    urlencode,
+    urlsplit,
+    urlunsplit,
+)
+from requests.adapters import HTTPAdapter
 
 __all__ = [
     "access_nested_map",
+    "async_memoize",
+    "configure_host",
+    "fetch_json",
+    "fetch_json_async",
     "get_json",
+    "get_json_async",
+    "get_json_pages",
+    "get_json_pages_async",
+    "get_rate_limiter",
+    "get_session",
+    "HTTPCache",
     "memoize",
+    "RateLimiter",
+    "set_cache_dir",
+    "set_rate_limiter",
 ]
 
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_TIMEOUT: Timeout = (3.05, 30)
+DEFAULT_POOL_MAXSIZE = 10
+RATE_LIMITED_STATUSES = (403, 429)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_host_timeouts: Dict[str, Timeout] = {}
+_http_cache: Optional["HTTPCache"] = None
+_rate_limiter: Optional["RateLimiter"] = None
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -40,11 +87,343 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
+def get_session() -> requests.Session:
+    """Return the shared HTTP session used by get_json.
+    The session is created once, under a lock, and keeps connections
+    alive in a urllib3 pool so repeated requests to a host skip the
+    TCP/TLS handshake. The pool is thread-safe.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_MAXSIZE,
+                                  pool_maxsize=DEFAULT_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            })
+            _session = session
+        return _session
+
+
+def configure_host(host: str, timeout: Optional[Timeout] = None,
+                   pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   max_retries: int = 0) -> None:
+    """Tune the connection pool and timeout used for one host.
+    Parameters
+    ----------
+    host: str
+        Host name, e.g. "api.github.com"
+    timeout: float or (connect, read) tuple
+        Timeout for requests to that host, DEFAULT_TIMEOUT if None
+    pool_maxsize: int
+        Number of keep-alive connections kept open to the host
+    max_retries: int
+        Retries for failed connections (not for HTTP error responses)
+    """
+    session = get_session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize,
+                          max_retries=max_retries)
+    with _session_lock:
+        session.mount("https://{}/".format(host), adapter)
+        session.mount("http://{}/".format(host), adapter)
+        if timeout is None:
+            _host_timeouts.pop(host, None)
+        else:
+            _host_timeouts[host] = timeout
+
+
+class HTTPCache:
+    """On-disk cache of JSON responses and their validators.
+    Each URL is stored as one JSON file holding the body together with
+    the ETag and Last-Modified headers it was served with.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Use (and create if needed) directory for the cache files."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        """Path of the cache file for url."""
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, name + ".json")
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for url, or None."""
+        try:
+            with open(self._path(url)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, body: Any, etag: Optional[str],
+              last_modified: Optional[str],
+              links: Optional[Dict] = None) -> None:
+        """Atomically write the entry for url."""
+        entry = {"url": url, "etag": etag, "last_modified": last_modified,
+                 "links": links or {}, "body": body}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(url))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class RateLimiter:
+    """Thread-safe token bucket that paces requests to an API.
+    Tokens refill at rate per second up to burst. update() reads the
+    X-RateLimit-Remaining / X-RateLimit-Reset (and Retry-After) headers
+    of each response: the bucket never holds more tokens than the server
+    says remain, and when none remain acquire() waits for the reset.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10) -> None:
+        """Allow rate requests per second on average, burst at once."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill (lock held)."""
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Block until a request may be sent, then take one token."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def update(self, headers: Mapping) -> bool:
+        """Adjust the bucket to the rate limit headers of a response.
+        Returns True when the headers paused the bucket.
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        paused = False
+        with self._lock:
+            now = time.monotonic()
+            if remaining is not None:
+                self._tokens = min(self._tokens, float(remaining))
+                if int(remaining) <= 0 and reset is not None:
+                    self._pause(now, float(reset) - time.time())
+                    paused = True
+            if retry_after is not None:
+                self._pause(now, float(retry_after))
+                paused = True
+        return paused
+
+    def _pause(self, now: float, seconds: float) -> None:
+        """Hold every request for seconds from now (lock held)."""
+        self._paused_until = max(self._paused_until, now + max(0, seconds))
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Make every get_json / fetch_json call go through limiter, or
+    through none with None. The limiter is process-wide because the
+    API rate limit it tracks applies to the whole process.
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the limiter installed with set_rate_limiter, if any."""
+    return _rate_limiter
+
+
+def set_cache_dir(directory: Optional[str]) -> None:
+    """Enable the conditional-request cache of get_json in directory,
+    or disable it with None.
+    """
+    global _http_cache
+    _http_cache = HTTPCache(directory) if directory else None
+
+
+def fetch_json(url: str, limiter: Optional[RateLimiter] = None
+               ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+    """Get JSON from remote URL together with its parsed Link header.
+    The request goes through the shared session from get_session.
+    When a cache directory is set (set_cache_dir or the
+    GITHUB_CLIENT_CACHE_DIR environment variable), a cached payload is
+    revalidated with If-None-Match / If-Modified-Since and returned
+    as is on 304 Not Modified. Requests wait for limiter, or else for
+    the rate limiter set with set_rate_limiter, if any; a 403/429
+    response that pauses it (secondary rate limit) is retried once
+    after the pause.
+    Returns
+    -------
+    (payload, links) where links maps a rel ("next", "last", ...) to
+    {"url": ..., "rel": ...} as in requests.Response.links
+    """
+    host = urlsplit(url).hostname or ""
+    timeout = _host_timeouts.get(host, DEFAULT_TIMEOUT)
+    cache = _http_cache
+    entry = cache.load(url) if cache else None
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    limiter = limiter or _rate_limiter
+    for attempt in range(2):
+        if limiter:
+            limiter.acquire()
+        response = get_session().get(url, timeout=timeout, headers=headers)
+        paused = limiter is not None and limiter.update(response.headers)
+        if not paused or response.status_code not in RATE_LIMITED_STATUSES:
+            break
+    if entry and response.status_code == 304:
+        return entry["body"], entry.get("links") or {}
+
+    payload = response.json()
+    links = response.links
+    if cache and response.status_code == 200:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.store(url, payload, etag, last_modified, links)
+    return payload, links
+
+
+def get_json(url: str, limiter: Optional[RateLimiter] = None) -> Dict:
     """Get JSON from remote URL.
+    See fetch_json for connection reuse, caching and limiter.
+    """
+    return fetch_json(url, limiter)[0]
+
+
+def _page_urls(last_url: str) -> Optional[List[str]]:
+    """URLs of pages 2..N given the URL of the last page N, or None if
+    the pages are not numbered with a page query parameter.
+    """
+    parts = urlsplit(last_url)
+    query = parse_qs(parts.query)
+    try:
+        last_page = int(query["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+    urls = []
+    for page in range(2, last_page + 1):
+        query["page"] = [str(page)]
+        urls.append(urlunsplit(parts._replace(
+            query=urlencode(query, doseq=True))))
+    return urls
+
+
+def get_json_pages(url: str, max_workers: int = 8,
+                   limiter: Optional[RateLimiter] = None) -> Iterator[Any]:
+    """Yield the items of a paginated JSON list API, page after page.
+    Pages are found through the Link header. When the first page links
+    to a numbered last page, the remaining pages are fetched
+    concurrently on max_workers threads (items are still yielded in
+    order); otherwise rel="next" links are followed one by one.
+    Every request waits for limiter as in fetch_json.
     """
-    response = requests.get(url)
-    return response.json()
+    page, links = fetch_json(url, limiter)
+    yield from page
+
+    last_url = links.get("last", {}).get("url")
+    page_urls = _page_urls(last_url) if last_url else None
+    if page_urls:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in executor.map(get_json, page_urls,
+                                     [limiter] * len(page_urls)):
+                yield from page
+        return
+
+    next_url = links.get("next", {}).get("url")
+    while next_url:
+        page, links = fetch_json(next_url, limiter)
+        yield from page
+        next_url = links.get("next", {}).get("url")
+
+
+async def fetch_json_async(url: str, session: Any,
+                           limiter: Optional[Any] = None
+                           ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+    """Async fetch_json over an aiohttp.ClientSession.
+    Parameters
+    ----------
+    url: str
+        URL to fetch
+    session: aiohttp.ClientSession
+        Shared session; its connector pools the connections
+    limiter: async context manager, e.g. asyncio.Semaphore
+        Bounds how many requests are in flight at once
+    Returns
+    -------
+    (payload, links) with links in the same shape as fetch_json
+    """
+    async with limiter or contextlib.nullcontext():
+        async with session.get(url) as response:
+            payload = await response.json()
+            links = {
+                str(rel): {"url": str(link["url"]), "rel": str(rel)}
+                for rel, link in response.links.items()
+            }
+    return payload, links
+
+
+async def get_json_async(url: str, session: Any,
+                         limiter: Optional[Any] = None) -> Any:
+    """Async get_json, see fetch_json_async.
+    """
+    return (await fetch_json_async(url, session, limiter))[0]
+
+
+async def get_json_pages_async(url: str, session: Any,
+                               limiter: Optional[Any] = None
+                               ) -> AsyncIterator[Any]:
+    """Async get_json_pages: yields the items of every page in order.
+    Pages up to a numbered rel="last" are fetched concurrently (bounded
+    by limiter); otherwise rel="next" links are followed.
+    """
+    page, links = await fetch_json_async(url, session, limiter)
+    for item in page:
+        yield item
+
+    last_url = links.get("last", {}).get("url")
+    page_urls = _page_urls(last_url) if last_url else None
+    if page_urls:
+        pages = await asyncio.gather(
+            *(get_json_async(u, session, limiter) for u in page_urls))
+        for page in pages:
+            for item in page:
+                yield item
+        return
+
+    next_url = links.get("next", {}).get("url")
+    while next_url:
+        page, links = await fetch_json_async(next_url, session, limiter)
+        for item in page:
+            yield item
+        next_url = links.get("next", {}).get("url")
+
+
+set_cache_dir(os.environ.get("GITHUB_CLIENT_CACHE_DIR"))
 
 
 def memoize(fn: Callable) -> Callable:
@@ -73,3 +452,37 @@ def memoize(fn: Callable) -> Callable:
         return getattr(self, attr_name)
 
     return property(memoized)
+
+
+def async_memoize(fn: Callable) -> Callable:
+    """Decorator to memoize a coroutine method as an awaitable property.
+    The first access schedules fn(self) as a task; every access returns
+    that same task, so concurrent awaits share a single call. A task that
+    fails or is cancelled is dropped, so the next access calls fn again.
+    Example
+    -------
+    class MyClass:
+        @async_memoize
+        async def a_method(self):
+            return 42
+    >>> await my_object.a_method
+    42
+    """
+    attr_name = "_{}".format(fn.__name__)
+
+    @wraps(fn)
+    def memoized(self):
+        """"memoized wraps"""
+        if not hasattr(self, attr_name):
+            task = asyncio.ensure_future(fn(self))
+
+            def forget_failed(task: asyncio.Future) -> None:
+                if task.cancelled() or task.exception() is not None:
+                    if getattr(self, attr_name, None) is task:
+                        delattr(self, attr_name)
+
+            task.add_done_callback(forget_failed)
+            setattr(self, attr_name, task)
+        return getattr(self, attr_name)
+
+    return property(memoized)
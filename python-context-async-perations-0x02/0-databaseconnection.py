@@ -1,22 +1,101 @@
 import sqlite3
+import queue
+import threading
+
+# Applied once to every pooled connection when it is opened
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,   # bytes
+    "cache_size": -64 * 1024,         # negative means KiB, i.e. 64 MiB
+}
+
+
+# Bounded pool of warm connections to one database file
+class ConnectionPool:
+    def __init__(self, db_file, size=5, timeout=30, pragmas=None):
+        self.db_file = db_file
+        self.timeout = timeout
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No free connection to {self.db_file}")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file, **options):
+    with _pools_lock:
+        pool = _pools.get(db_file)
+        if pool is None:
+            pool = _pools[db_file] = ConnectionPool(db_file, **options)
+        return pool
+
 
 # Class-based context manager for database connection
+# With pooled=True the connection is checked out of a shared pool on
+# enter and handed back on exit instead of being opened and closed
 class DatabaseConnection:
-    def __init__(self, db_file):
+    def __init__(self, db_file, pooled=False):
         self.db_file = db_file
+        self.pooled = pooled
         self.conn = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_file)
+        if self.pooled:
+            self.conn = get_pool(self.db_file).acquire()
+        else:
+            self.conn = sqlite3.connect(self.db_file)
         return self.conn
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self.conn:
-            self.conn.close()
+            if self.pooled:
+                get_pool(self.db_file).release(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
 
 # Use the context manager to fetch data
 if __name__ == "__main__":
-    with DatabaseConnection('users.db') as conn:
+    with DatabaseConnection('users.db', pooled=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users")
         results = cursor.fetchall()
@@ -1,22 +1,42 @@
 import sqlite3
 
 class ExecuteQuery:
-    def __init__(self, query, params=None):
+    # With stream=True, __enter__ returns an iterator over the open cursor
+    # instead of a fetchall() list: rows one by one, or lists of up to
+    # batch_size rows (fetchmany) when batch_size is set. The cursor and
+    # connection stay open until __exit__, so memory use stays constant.
+    def __init__(self, query, params=None, stream=False, batch_size=None):
         self.query = query
         self.params = params or []
+        self.stream = stream
+        self.batch_size = batch_size
         self.conn = None
+        self.cursor = None
         self.result = None
 
+    def _batches(self):
+        while True:
+            rows = self.cursor.fetchmany(self.batch_size)
+            if not rows:
+                return
+            yield rows
+
     def __enter__(self):
         self.conn = sqlite3.connect('users.db')
-        cursor = self.conn.cursor()
-        cursor.execute(self.query, self.params)
-        self.result = cursor.fetchall()
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(self.query, self.params)
+        if self.stream:
+            return self._batches() if self.batch_size else iter(self.cursor)
+        self.result = self.cursor.fetchall()
         return self.result
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.cursor:
+            self.cursor.close()
+            self.cursor = None
         if self.conn:
             self.conn.close()
+            self.conn = None
 
 # Usage example
 if __name__ == "__main__":
@@ -25,3 +45,8 @@ if __name__ == "__main__":
 
     with ExecuteQuery(query, param) as results:
         print(results)
+
+    with ExecuteQuery(query, param, stream=True, batch_size=100) as batches:
+        for batch in batches:
+            for row in batch:
+                print(row)
@@ -1,6 +1,87 @@
 import asyncio
 import aiosqlite
 
+# Runs many queries concurrently over a shared, bounded pool of aiosqlite
+# connections. At most max_concurrency queries run at once (one per
+# connection); each query can have a timeout, counted from when it gets a
+# connection (time spent waiting for a free one is not included), after
+# which it is interrupted and cancelled. Nothing is printed: results are
+# returned.
+class QueryFanOut:
+    def __init__(self, db_path='users.db', max_concurrency=5, timeout=None):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+    async def _acquire(self):
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            return await aiosqlite.connect(self.db_path)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn):
+        self._idle.append(conn)
+        self._slots.release()
+
+    @staticmethod
+    async def _query(conn, query, params):
+        async with conn.execute(query, params) as cursor:
+            return await cursor.fetchall()
+
+    async def fetch(self, query, params=(), timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        conn = await self._acquire()
+        try:
+            return await asyncio.wait_for(self._query(conn, query, params),
+                                          timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Stop the statement still running on the connection's thread
+            await conn.interrupt()
+            raise
+        finally:
+            self._release(conn)
+
+    @staticmethod
+    def _split(query):
+        return query if isinstance(query, tuple) else (query, ())
+
+    async def run(self, queries, timeout=None, return_exceptions=False):
+        # queries: SQL strings or (sql, params) tuples; results in order
+        return await asyncio.gather(
+            *(self.fetch(*self._split(q), timeout=timeout) for q in queries),
+            return_exceptions=return_exceptions)
+
+    async def as_completed(self, queries, timeout=None):
+        # Async stream of (index, rows) pairs in completion order; pending
+        # queries are cancelled if the consumer stops early
+        async def indexed(i, query):
+            return i, await self.fetch(*self._split(query), timeout=timeout)
+
+        tasks = [asyncio.create_task(indexed(i, q))
+                 for i, q in enumerate(queries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
 # Asynchronous function to fetch all users
 async def async_fetch_users():
     async with aiosqlite.connect('users.db') as db:
@@ -21,13 +102,77 @@ async def async_fetch_older_users():
                 print(row)
             return rows
 
+# Async stream of lists of up to chunk_size rows. Up to `prefetch` chunks
+# are read ahead while the consumer works; when that many are waiting the
+# reader pauses, so a slow consumer holds back the database reads
+# (prefetch=0 only reads when the consumer asks for the next chunk).
+async def async_stream_chunks(query, params=(), chunk_size=500, prefetch=1,
+                              db_path='users.db'):
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(query, params) as cursor:
+            if not prefetch:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield rows
+
+            chunks = asyncio.Queue(maxsize=prefetch)
+
+            async def read_ahead():
+                try:
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        await chunks.put(rows)
+                        if not rows:
+                            return
+                except Exception as e:
+                    await chunks.put(e)
+
+            reader = asyncio.create_task(read_ahead())
+            try:
+                while True:
+                    rows = await chunks.get()
+                    if isinstance(rows, Exception):
+                        raise rows
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                reader.cancel()
+                await asyncio.gather(reader, return_exceptions=True)
+
+# Async stream of single rows, read from the database in chunks
+async def async_stream_rows(query, params=(), chunk_size=500, prefetch=1,
+                            db_path='users.db'):
+    async for rows in async_stream_chunks(query, params, chunk_size,
+                                          prefetch, db_path):
+        for row in rows:
+            yield row
+
+# Streaming variant of async_fetch_users
+def async_stream_users(chunk_size=500, prefetch=1):
+    return async_stream_rows("SELECT * FROM users", (), chunk_size, prefetch)
+
+# Streaming variant of async_fetch_older_users
+def async_stream_older_users(age=40, chunk_size=500, prefetch=1):
+    return async_stream_rows("SELECT * FROM users WHERE age > ?", (age,),
+                             chunk_size, prefetch)
+
 # Function to run both queries concurrently
 async def fetch_concurrently():
-    await asyncio.gather(
-        async_fetch_users(),
-        async_fetch_older_users()
-    )
+    async with QueryFanOut('users.db') as fan_out:
+        return await fan_out.run([
+            "SELECT * FROM users",
+            ("SELECT * FROM users WHERE age > ?", (40,)),
+        ])
 
 # Run the concurrent fetch
 if __name__ == "__main__":
-    asyncio.run(fetch_concurrently())
+    all_users, older_users = asyncio.run(fetch_concurrently())
+    print("[All Users]")
+    for row in all_users:
+        print(row)
+    print("\n[Users older than 40]")
+    for row in older_users:
+        print(row)
@@ -0,0 +1,117 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PRAGMAS = __import__('0-databaseconnection').PRAGMAS
+
+# Runs sqlite work on dedicated threads so neither sync nor async callers
+# block on it directly. All writes go through one writer thread (so they
+# never contend with each other for the lock) and reads are spread over a
+# pool of reader threads; in WAL mode readers and the writer run in
+# parallel. Every method has a sync form and an awaitable *_async form.
+class SQLiteExecutor:
+    def __init__(self, db_file='users.db', readers=4, busy_timeout=5.0):
+        self.db_file = db_file
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='sqlite-writer',
+            initializer=self._open, initargs=(False,))
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix='sqlite-reader',
+            initializer=self._open, initargs=(True,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Opens the calling worker thread's own connection
+    def _open(self, read_only):
+        conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout,
+                               check_same_thread=False)
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        self._local.conn = conn
+        with self._conns_lock:
+            self._conns.append(conn)
+
+    def _fetch(self, query, params):
+        cursor = self._local.conn.execute(query, params)
+        try:
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _execute(self, query, params, many):
+        conn = self._local.conn
+        with conn:
+            if many:
+                return conn.executemany(query, params).rowcount
+            return conn.execute(query, params).rowcount
+
+    def _transaction(self, func, args, kwargs):
+        conn = self._local.conn
+        with conn:
+            return func(conn, *args, **kwargs)
+
+    # Sync API: waits for the worker thread and returns its result
+    def fetch(self, query, params=()):
+        return self._readers.submit(self._fetch, query, params).result()
+
+    def execute(self, query, params=()):
+        return self._writer.submit(self._execute, query, params,
+                                   False).result()
+
+    def executemany(self, query, seq_of_params):
+        return self._writer.submit(self._execute, query, seq_of_params,
+                                   True).result()
+
+    def transaction(self, func, *args, **kwargs):
+        # func(conn, *args, **kwargs) runs on the writer thread in one
+        # transaction, committed on return and rolled back on error
+        return self._writer.submit(self._transaction, func, args,
+                                   kwargs).result()
+
+    # Awaitable API: the event loop keeps running while the thread works
+    async def fetch_async(self, query, params=()):
+        return await asyncio.wrap_future(
+            self._readers.submit(self._fetch, query, params))
+
+    async def execute_async(self, query, params=()):
+        return await asyncio.wrap_future(
+            self._writer.submit(self._execute, query, params, False))
+
+    async def executemany_async(self, query, seq_of_params):
+        return await asyncio.wrap_future(
+            self._writer.submit(self._execute, query, seq_of_params, True))
+
+    async def transaction_async(self, func, *args, **kwargs):
+        return await asyncio.wrap_future(
+            self._writer.submit(self._transaction, func, args, kwargs))
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._conns_lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+
+
+if __name__ == "__main__":
+    async def main(executor):
+        all_users, older_users = await asyncio.gather(
+            executor.fetch_async("SELECT * FROM users"),
+            executor.fetch_async("SELECT * FROM users WHERE age > ?", (40,)))
+        print(len(all_users), len(older_users))
+
+    with SQLiteExecutor('users.db') as executor:
+        print(executor.fetch("SELECT * FROM users WHERE age > ?", (25,)))
+        asyncio.run(main(executor))
@@ -1,26 +1,62 @@
-import sqlite3
 import functools
-from datetime import datetime
+import random
+import time
+
+import query_log
+from connection_pool import with_db_connection
+from query_cache import split_query
+
+
+# Logs one finished call of a decorated `func(conn, query, *params)`.
+# Failed calls and calls slower than `slow_ms` are always logged, the
+# rest only for a `sample_rate` fraction of calls.
+def log_call(args, kwargs, duration_ms, result=None, error=None,
+             sample_rate=1.0, slow_ms=None, status=None):
+    slow = slow_ms is not None and duration_ms >= slow_ms
+    if (error is None and not slow and sample_rate < 1
+            and random.random() >= sample_rate):
+        return
+    query, params = split_query(args, kwargs)
+    rows = len(result) if hasattr(result, '__len__') else None
+    query_log.log_query(query, params, duration_ms, rows, slow, error,
+                        status)
+
+# Decorator to log SQL queries as structured records (query, parameter
+# fingerprint, duration, row count, status) written by a background
+# thread. Only a `sample_rate` fraction of calls is logged, but failed
+# calls and calls slower than `slow_ms` milliseconds are always logged.
+# Calls stopped by a BaseException (KeyboardInterrupt, cancellation) are
+# not query errors: they are sampled like the rest as "cancelled".
+def log_queries(func=None, *, sample_rate=1.0, slow_ms=None):
+    if func is None:
+        return functools.partial(log_queries, sample_rate=sample_rate,
+                                 slow_ms=slow_ms)
 
-# Decorator to log SQL queries with timestamps
-def log_queries(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        query = kwargs.get('query') or (args[0] if args else None)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] Executing SQL Query: {query}")
-        return func(*args, **kwargs)
+        start = time.perf_counter()
+        result = error = None
+        status = "cancelled"    # unless func returns or raises an Exception
+        try:
+            result = func(*args, **kwargs)
+            status = "ok"
+            return result
+        except Exception as e:
+            error, status = e, "error"
+            raise
+        finally:
+            log_call(args, kwargs, (time.perf_counter() - start) * 1000,
+                     result, error, sample_rate, slow_ms, status)
     return wrapper
 
+# Pooled connection, so repeated queries reuse its compiled statements
 @log_queries
-def fetch_all_users(query):
-    conn = sqlite3.connect('users.db')
+@with_db_connection
+def fetch_all_users(conn, query):
     cursor = conn.cursor()
     cursor.execute(query)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    return cursor.fetchall()
 
 #### fetch users while logging the query
-users = fetch_all_users(query="SELECT * FROM users")
-
+if __name__ == "__main__":
+    users = fetch_all_users(query="SELECT * FROM users")
@@ -1,18 +1,5 @@
-import sqlite3
-import functools
-
-# Decorator to handle opening and closing DB connections
-def with_db_connection(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            # Pass the connection to the decorated function
-            result = func(conn, *args, **kwargs)
-        finally:
-            conn.close()
-        return result
-    return wrapper
+# Pooled decorator: reuses connections instead of opening one per call
+from connection_pool import with_db_connection
 
 @with_db_connection
 def fetch_users(conn, query):
@@ -1,25 +1,179 @@
 import sqlite3
 import functools
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
 
-# Decorator to automatically handle DB connection
-def with_db_connection(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+from connection_pool import (
+    DEFAULT_DB, StatementCachingConnection, with_db_connection)
+from query_cache import query_cache, track_tables, WRITE_ACTIONS
+
+
+# Group commit: calls are queued to one writer thread per database, which
+# runs every call that arrives within `window` seconds (up to `max_batch`)
+# inside a single transaction and commits once. Each call runs in its own
+# SAVEPOINT, so a failing call is rolled back alone. Every call gets a
+# Future that resolves when its batch has committed.
+class GroupCommitter:
+    def __init__(self, db_path, window=0.005, max_batch=100):
+        self.db_path = db_path
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, args, kwargs):
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        # Autocommit mode: transactions are opened and closed explicitly.
+        # The connection lives as long as the writer, so its compiled
+        # statements are reused across batches.
+        conn = sqlite3.connect(self.db_path, isolation_level=None,
+                               factory=StatementCachingConnection)
         try:
-            result = func(conn, *args, **kwargs)
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                deadline = time.monotonic() + self.window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._commit(conn, batch)
+                        return
+                    batch.append(item)
+                self._commit(conn, batch)
         finally:
             conn.close()
-        return result
-    return wrapper
+
+    # Never raises, so the writer thread survives any failure: futures the
+    # batch could not resolve get the exception instead
+    def _commit(self, conn, batch):
+        try:
+            self._commit_batch(conn, batch)
+        except Exception as e:
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            print(f"[ERROR] Group commit failed. Rolled back. Reason: {e}")
+            for future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _commit_batch(self, conn, batch):
+        done = []
+        with track_tables(conn, WRITE_ACTIONS) as written:
+            conn.execute("BEGIN")
+            for future, func, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT call")
+                try:
+                    result = func(conn, *args, **kwargs)
+                    if not conn.in_transaction:
+                        raise sqlite3.OperationalError(
+                            "call ended the group transaction")
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK TO call")
+                        conn.execute("RELEASE call")
+                    else:
+                        # SQLite dropped the whole transaction (e.g. INSERT
+                        # OR ROLLBACK on a conflict), so the earlier calls
+                        # of the batch were undone as well
+                        for earlier, _ in done:
+                            earlier.set_exception(e)
+                        done = []
+                        conn.execute("BEGIN")
+                    print(f"[ERROR] Transaction failed. Rolled back. Reason: {e}")
+                    future.set_exception(e)
+                else:
+                    conn.execute("RELEASE call")
+                    done.append((future, result))
+            try:
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"[ERROR] Group commit failed. Rolled back. Reason: {e}")
+                for future, _ in done:
+                    future.set_exception(e)
+                return
+        query_cache.invalidate_tables(written)
+        for future, result in done:
+            future.set_result(result)
+
+
+_committers = {}
+_committers_lock = threading.Lock()
+
+
+# Returns the shared committer for db_path and options; decorators asking
+# for a different window or max_batch get their own writer thread
+def get_committer(db_path=DEFAULT_DB, **options):
+    key = (db_path, tuple(sorted(options.items())))
+    with _committers_lock:
+        committer = _committers.get(key)
+        if committer is None:
+            committer = _committers[key] = GroupCommitter(db_path, **options)
+        return committer
+
+
+# Waits for queued writes to commit before the interpreter exits
+@atexit.register
+def _close_committers():
+    with _committers_lock:
+        for committer in _committers.values():
+            committer.close()
+        _committers.clear()
+
 
 # Decorator to manage DB transactions (commit/rollback)
-def transactional(func):
+# After a commit, cached query results that read a written table are dropped
+# With group_commit=True the function must not be wrapped in
+# with_db_connection: it is called on the writer thread's connection and
+# the decorated function returns a Future instead of the result.
+def transactional(func=None, *, group_commit=False, db_path=DEFAULT_DB,
+                  window=0.005, max_batch=100):
+    if func is None:
+        return functools.partial(transactional, group_commit=group_commit,
+                                 db_path=db_path, window=window,
+                                 max_batch=max_batch)
+
+    if group_commit:
+        @functools.wraps(func)
+        def group_wrapper(*args, **kwargs):
+            committer = get_committer(db_path, window=window,
+                                      max_batch=max_batch)
+            return committer.submit(func, args, kwargs)
+        return group_wrapper
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
         try:
-            result = func(conn, *args, **kwargs)
+            with track_tables(conn, WRITE_ACTIONS) as written:
+                result = func(conn, *args, **kwargs)
             conn.commit()
+            query_cache.invalidate_tables(written)
             return result
         except Exception as e:
             conn.rollback()
@@ -27,12 +181,18 @@ def transactional(func):
             raise
     return wrapper
 
-@with_db_connection 
-@transactional 
-def update_user_email(conn, user_id, new_email): 
-    cursor = conn.cursor() 
+@with_db_connection
+@transactional
+def update_user_email(conn, user_id, new_email):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+# Bulk variant: updates issued close together share one commit
+@transactional(group_commit=True)
+def queue_user_email_update(conn, user_id, new_email):
+    cursor = conn.cursor()
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
 
-# Update user's email with automatic transaction handling 
+# Update user's email with automatic transaction handling
 if __name__ == "__main__":
     update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
@@ -1,37 +1,108 @@
 import time
-import sqlite3 
+import sqlite3
+import random
+import asyncio
+import inspect
 import functools
+import threading
+
+from connection_pool import with_db_connection
+
+# sqlite3 messages that mean another connection holds the lock for now
+TRANSIENT_MESSAGES = ("database is locked", "database table is locked",
+                      "database is busy")
+
+
+# Default classifier: only retry lock contention, not real errors
+def is_transient(exc):
+    return (isinstance(exc, sqlite3.OperationalError)
+            and any(msg in str(exc) for msg in TRANSIENT_MESSAGES))
+
+
+# Process-wide retry budget (token bucket). Every retry spends a token and
+# every successful call earns back `refill` tokens, so retries stay a small
+# fraction of traffic. An empty bucket acts as an open circuit breaker:
+# failures are raised at once instead of retried.
+class RetryBudget:
+    def __init__(self, max_tokens=10, refill=0.1):
+        self.max_tokens = max_tokens
+        self.refill = refill
+        self.tokens = float(max_tokens)
+        self._lock = threading.Lock()
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.refill)
+
+
+default_budget = RetryBudget()
+
+
+# Exponential backoff with full jitter: sleep a random time between 0 and
+# min(max_delay, delay * 2 ** (attempt - 1))
+def backoff(attempt, delay, max_delay):
+    return random.uniform(0, min(max_delay, delay * 2 ** (attempt - 1)))
+
+
+# Decorator to retry function on transient failure. Works on plain and
+# async functions (async ones sleep with asyncio.sleep).
+def retry_on_failure(retries=3, delay=2, max_delay=30, retry_on=is_transient,
+                     budget=default_budget):
+    def should_retry(attempt, e):
+        print(f"[WARNING] Attempt {attempt} failed: {e}")
+        if attempt >= retries:
+            print("[ERROR] All retry attempts failed.")
+            return False
+        if not retry_on(e):
+            return False
+        if budget is not None and not budget.try_spend():
+            print("[ERROR] Retry budget exhausted, not retrying.")
+            return False
+        return True
+
+    def succeeded():
+        if budget is not None:
+            budget.record_success()
 
-# Decorator to automatically handle DB connection
-def with_db_connection(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-        finally:
-            conn.close()
-        return result
-    return wrapper
-
-# Decorator to retry function on failure
-
-def retry_on_failure(retries=3, delay=2):
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempt = 0
+                while True:
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        attempt += 1
+                        if not should_retry(attempt, e):
+                            raise
+                        await asyncio.sleep(backoff(attempt, delay, max_delay))
+                    else:
+                        succeeded()
+                        return result
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             attempt = 0
-            while attempt < retries:
+            while True:
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except Exception as e:
                     attempt += 1
-                    print(f"[WARNING] Attempt {attempt} failed: {e}")
-                    if attempt < retries:
-                        time.sleep(delay)
-                    else:
-                        print("[ERROR] All retry attempts failed.")
+                    if not should_retry(attempt, e):
                         raise
+                    time.sleep(backoff(attempt, delay, max_delay))
+                else:
+                    succeeded()
+                    return result
         return wrapper
     return decorator
 
@@ -1,25 +1,32 @@
-import time
-import sqlite3 
 import functools
 
+from connection_pool import with_db_connection
+from query_cache import (
+    query_cache, cache_key, track_tables, READ_ACTIONS)
 
-query_cache = {}
 
-### decorator to automatically handle database connections
+# Decorator to cache query results keyed on the normalised SQL text plus
+# any other arguments (the bound parameters). Entries are evicted LRU,
+# expire after `ttl` seconds and are dropped when a write through
+# @transactional touches a table they read.
+def cache_query(func=None, *, ttl=None, cache=query_cache):
+    if func is None:
+        return functools.partial(cache_query, ttl=ttl, cache=cache)
 
-def with_db_connection(func):
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')  # Replace with your DB
-        try:
+    def wrapper(conn, *args, **kwargs):
+        key = cache_key(func, args, kwargs)
+        result, hit = cache.get(key)
+        if hit:
+            return result
+        generation = cache.generation()
+        with track_tables(conn, READ_ACTIONS) as tables:
             result = func(conn, *args, **kwargs)
-        finally:
-            conn.close()
+        cache.put(key, result, tables, ttl, generation)
         return result
     return wrapper
 
 
-
 @with_db_connection
 @cache_query
 def fetch_users_with_cache(conn, query):
@@ -27,8 +34,11 @@ def fetch_users_with_cache(conn, query):
     cursor.execute(query)
     return cursor.fetchall()
 
-#### First call will cache the result
-users = fetch_users_with_cache(query="SELECT * FROM users")
 
-#### Second call will use the cached result
-users_again = fetch_users_with_cache(query="SELECT * FROM users")
\ No newline at end of file
+if __name__ == "__main__":
+    #### First call will cache the result
+    users = fetch_users_with_cache(query="SELECT * FROM users")
+
+    #### Second call will use the cached result
+    users_again = fetch_users_with_cache(query="SELECT * FROM users")
+    print(query_cache.stats())
@@ -0,0 +1,242 @@
+import asyncio
+import functools
+import inspect
+import time
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+import connection_pool
+from connection_pool import DEFAULT_DB
+from query_cache import (
+    query_cache, cache_key, table_recorder, READ_ACTIONS, WRITE_ACTIONS)
+
+# Async counterparts of the decorators in this directory. Each decorator
+# checks whether it wraps a coroutine function: coroutines get the async
+# implementation below, plain functions get the original sync decorator.
+_log_queries = __import__('0-log_queries').log_queries
+_log_call = __import__('0-log_queries').log_call
+_transactional = __import__('2-transactional').transactional
+_retry = __import__('3-retry_on_failure')
+_cache_query = __import__('4-cache_query').cache_query
+
+# retry_on_failure already awaits asyncio.sleep for coroutine functions
+retry_on_failure = _retry.retry_on_failure
+
+
+# Bounded pool of aiosqlite connections for one database file, used from
+# a single event loop. aiosqlite runs every connection on a non-daemon
+# thread, so the pool must be closed (or used as `async with`) for the
+# interpreter to exit.
+class AsyncConnectionPool:
+    def __init__(self, db_path, max_size=5, max_idle=300, timeout=30):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.max_idle = max_idle    # seconds an idle connection is kept
+        self.timeout = timeout      # seconds to wait for a free connection
+        self._idle = []             # (conn, released_at), most recent last
+        self._slots = asyncio.Semaphore(max_size)
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No free connection to {self.db_path} "
+                               f"after {self.timeout}s") from None
+        try:
+            cutoff = time.monotonic() - self.max_idle
+            while self._idle and self._idle[0][1] < cutoff:
+                conn, _ = self._idle.pop(0)
+                await conn.close()
+            while self._idle:
+                conn, _ = self._idle.pop()
+                try:
+                    async with conn.execute("SELECT 1"):
+                        pass
+                    return conn
+                except Exception:
+                    await conn.close()
+            return await aiosqlite.connect(self.db_path)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn):
+        try:
+            if self._closed:
+                await conn.close()
+                return
+            if conn.in_transaction:
+                await conn.rollback()
+            self._idle.append((conn, time.monotonic()))
+        except Exception:
+            await conn.close()
+        finally:
+            self._slots.release()
+
+    # Closes idle connections now and busy ones when they are released
+    async def close(self):
+        self._closed = True
+        while self._idle:
+            conn, _ = self._idle.pop()
+            await conn.close()
+
+
+_pools = {}   # (db_path, options, loop) -> AsyncConnectionPool
+
+
+# Returns the shared pool for db_path and options on the running event
+# loop. The pools hold aiosqlite threads open: await close_pools() before
+# the loop ends, e.g.
+#
+#     async def main():
+#         try:
+#             ...
+#         finally:
+#             await close_pools()
+def get_pool(db_path=DEFAULT_DB, **options):
+    loop = asyncio.get_running_loop()
+    key = (db_path, tuple(sorted(options.items())), loop)
+    pool = _pools.get(key)
+    if pool is None:
+        # Forget pools of event loops that were closed
+        for stale in [stale for stale in _pools if stale[2].is_closed()]:
+            del _pools[stale]
+        pool = _pools[key] = AsyncConnectionPool(db_path, **options)
+    return pool
+
+
+# Closes and forgets every pool of the running event loop
+async def close_pools():
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _pools if key[2] is loop]:
+        await _pools.pop(key).close()
+
+
+# Async version of query_cache.track_tables
+@asynccontextmanager
+async def track_tables(conn, actions):
+    tables = set()
+    await conn.set_authorizer(table_recorder(actions, tables))
+    try:
+        yield tables
+    finally:
+        await conn.set_authorizer(None)
+
+
+# Decorator to pass a pooled (aiosqlite) DB connection to the function
+def with_db_connection(func=None, *, db_path=DEFAULT_DB):
+    if func is None:
+        return functools.partial(with_db_connection, db_path=db_path)
+    if not inspect.iscoroutinefunction(func):
+        return connection_pool.with_db_connection(func, db_path=db_path)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        pool = get_pool(db_path)
+        conn = await pool.acquire()
+        try:
+            return await func(conn, *args, **kwargs)
+        finally:
+            await pool.release(conn)
+    return wrapper
+
+
+# Decorator to manage DB transactions (commit/rollback)
+def transactional(func=None, **options):
+    if func is None:
+        return functools.partial(transactional, **options)
+    if not inspect.iscoroutinefunction(func):
+        return _transactional(func, **options)
+
+    @functools.wraps(func)
+    async def wrapper(conn, *args, **kwargs):
+        try:
+            async with track_tables(conn, WRITE_ACTIONS) as written:
+                result = await func(conn, *args, **kwargs)
+            await conn.commit()
+            query_cache.invalidate_tables(written)
+            return result
+        except Exception as e:
+            await conn.rollback()
+            print(f"[ERROR] Transaction failed. Rolled back. Reason: {e}")
+            raise
+    return wrapper
+
+
+# Decorator to log SQL queries (see 0-log_queries.log_queries)
+def log_queries(func=None, *, sample_rate=1.0, slow_ms=None):
+    if func is None:
+        return functools.partial(log_queries, sample_rate=sample_rate,
+                                 slow_ms=slow_ms)
+    if not inspect.iscoroutinefunction(func):
+        return _log_queries(func, sample_rate=sample_rate, slow_ms=slow_ms)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = error = None
+        status = "cancelled"    # unless func returns or raises an Exception
+        try:
+            result = await func(*args, **kwargs)
+            status = "ok"
+            return result
+        except Exception as e:
+            error, status = e, "error"
+            raise
+        finally:
+            _log_call(args, kwargs, (time.perf_counter() - start) * 1000,
+                      result, error, sample_rate, slow_ms, status)
+    return wrapper
+
+
+# Decorator to cache query results (see 4-cache_query.cache_query)
+def cache_query(func=None, *, ttl=None, cache=query_cache):
+    if func is None:
+        return functools.partial(cache_query, ttl=ttl, cache=cache)
+    if not inspect.iscoroutinefunction(func):
+        return _cache_query(func, ttl=ttl, cache=cache)
+
+    @functools.wraps(func)
+    async def wrapper(conn, *args, **kwargs):
+        key = cache_key(func, args, kwargs)
+        result, hit = cache.get(key)
+        if hit:
+            return result
+        generation = cache.generation()
+        async with track_tables(conn, READ_ACTIONS) as tables:
+            result = await func(conn, *args, **kwargs)
+        cache.put(key, result, tables, ttl, generation)
+        return result
+    return wrapper
+
+
+@with_db_connection
+@cache_query
+async def async_fetch_users(conn, query):
+    async with conn.execute(query) as cursor:
+        return await cursor.fetchall()
+
+
+@with_db_connection
+@transactional
+async def async_update_user_email(conn, user_id, new_email):
+    await conn.execute("UPDATE users SET email = ? WHERE id = ?",
+                       (new_email, user_id))
+
+
+if __name__ == "__main__":
+    async def main():
+        try:
+            users = await async_fetch_users(query="SELECT * FROM users")
+            print(users)
+        finally:
+            await close_pools()
+    asyncio.run(main())
@@ -0,0 +1,243 @@
+import sqlite3
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+DEFAULT_DB = 'users.db'
+STATEMENT_CACHE_SIZE = 128
+
+
+# Hit/miss counters for the prepared statements of one pool
+class StatementStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else None}
+
+
+# sqlite3 keeps an LRU cache of compiled statements per connection, keyed
+# on the SQL text (`cached_statements`). SQLite runs the authorizer only
+# while it compiles a statement, so this connection installs one
+# authorizer for its whole life and counts a statement as a hit when it
+# ran without the authorizer firing, i.e. the compiled statement was
+# really reused. Installing an authorizer expires every compiled
+# statement, so table tracking (record_tables) never replaces it: the
+# tables each statement touches are remembered when it is compiled and
+# reported again whenever it is reused.
+class StatementCachingConnection(sqlite3.Connection):
+    def __init__(self, *args, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_size = kwargs.get('cached_statements',
+                                     STATEMENT_CACHE_SIZE)
+        self.stats = stats if stats is not None else StatementStats()
+        # sql -> frozenset of (action, table), in sqlite3's LRU order
+        self._statement_tables = OrderedDict()
+        self._compiled = None       # (action, table) seen while compiling
+        self._recorders = []        # (actions, tables) of record_tables
+        self.set_authorizer(self._authorize)
+
+    def _authorize(self, action, arg1, arg2, db_name, source):
+        if self._compiled is not None:
+            self._compiled.add((action, arg1.lower() if arg1 else None))
+        return sqlite3.SQLITE_OK
+
+    # Runs func(*args), one execute/executemany of sql, and records
+    # whether sqlite3 reused its compiled statement
+    def run_statement(self, sql, func, *args):
+        # sqlite3 may compile its own BEGIN before a DML statement
+        implicit_begin = (self.isolation_level is not None
+                          and not self.in_transaction)
+        self._compiled = compiled = set()
+        done = False
+        try:
+            result = func(*args)
+            done = True
+        finally:
+            # Remember the tables even if the statement failed once
+            # compiled: sqlite3 keeps it and may reuse it next time
+            self._compiled = None
+            if implicit_begin:
+                compiled.discard((sqlite3.SQLITE_TRANSACTION, 'begin'))
+            if not compiled and sql in self._statement_tables:
+                self._statement_tables.move_to_end(sql)
+            elif compiled or done:
+                self._statement_tables[sql] = frozenset(compiled)
+                if len(self._statement_tables) > self.cache_size:
+                    self._statement_tables.popitem(last=False)
+        hit = not compiled
+        self.stats.record(hit)
+        for actions, tables in self._recorders:
+            tables.update(table for action, table
+                          in self._statement_tables[sql]
+                          if action in actions and table)
+        return result
+
+    # Records the tables touched by `actions` while the block runs
+    @contextmanager
+    def record_tables(self, actions):
+        recorder = (actions, set())
+        self._recorders.append(recorder)
+        try:
+            yield recorder[1]
+        finally:
+            self._recorders.remove(recorder)
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or StatementCachingCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class StatementCachingCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return self.connection.run_statement(
+            sql, sqlite3.Cursor.execute, self, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.connection.run_statement(
+            sql, sqlite3.Cursor.executemany, self, sql, seq_of_parameters)
+
+
+# Bounded, thread-safe pool of sqlite3 connections for one database file
+class ConnectionPool:
+    def __init__(self, db_path, max_size=5, max_idle=300, timeout=30,
+                 statement_cache_size=STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.max_idle = max_idle    # seconds an idle connection is kept
+        self.timeout = timeout      # seconds to wait for a free connection
+        self.statement_cache_size = statement_cache_size
+        self.statement_stats = StatementStats()
+        self._idle = []             # (conn, released_at), most recent last
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        # Connections move between threads, but only one thread uses each.
+        # Pooled connections live on, so their statement caches stay warm.
+        return sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=self.statement_cache_size,
+                               factory=StatementCachingConnection,
+                               stats=self.statement_stats)
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            # Plain cursor, so health checks do not count as statement hits
+            sqlite3.Connection.cursor(conn).execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _evict_idle(self):
+        # Called with the lock held; oldest connections sit at the front
+        cutoff = time.monotonic() - self.max_idle
+        while self._idle and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.pop(0)
+            conn.close()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise TimeoutError(
+                        f"No free connection to {self.db_path} "
+                        f"after {self.timeout}s")
+
+        # Connect and health check outside the lock
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                conn.close()
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def release(self, conn):
+        # Drop any transaction the caller left open before reusing it
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except sqlite3.Error:
+            conn.close()
+            healthy = False
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Returns the shared pool for db_path and options, creating it on first
+# use; callers asking for different options get different pools
+def get_pool(db_path=DEFAULT_DB, **options):
+    key = (db_path, tuple(sorted(options.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, **options)
+        return pool
+
+
+# Decorator to pass a pooled DB connection to the decorated function
+# Usable bare (@with_db_connection) or configured
+# (@with_db_connection(db_path='other.db'))
+def with_db_connection(func=None, *, db_path=DEFAULT_DB):
+    if func is None:
+        return functools.partial(with_db_connection, db_path=db_path)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        pool = get_pool(db_path)
+        conn = pool.acquire()
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            pool.release(conn)
+    return wrapper
@@ -0,0 +1,157 @@
+import copy
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# sqlite3 authorizer actions whose first argument is the table touched
+READ_ACTIONS = (sqlite3.SQLITE_READ,)
+WRITE_ACTIONS = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE,
+                 sqlite3.SQLITE_DELETE, sqlite3.SQLITE_DROP_TABLE)
+
+
+# Quoted SQL literals and identifiers ('' and "" are escaped quotes)
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+
+# Normalise SQL text so formatting differences share one cache entry;
+# whitespace is only collapsed outside quoted literals, so 'John  Smith'
+# and 'John Smith' stay different queries
+def normalize_query(query):
+    parts = _QUOTED.split(query)
+    for i in range(0, len(parts), 2):   # even parts are outside quotes
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip().rstrip(";").rstrip()
+
+
+# (query, params) of a call of a decorated `func(conn, query, *params)`,
+# with the connection already injected and so not in `args`
+def split_query(args, kwargs):
+    if 'query' in kwargs:
+        return kwargs['query'], args
+    return (args[0], args[1:]) if args else (None, ())
+
+
+# Cache key for a call of a decorated `func(conn, query, *params)`: the
+# normalised SQL plus the remaining arguments (the bound parameters)
+def cache_key(func, args, kwargs):
+    query, params = split_query(args, kwargs)
+    options = tuple(sorted((k, v) for k, v in kwargs.items() if k != 'query'))
+    return (func.__qualname__, normalize_query(query or ''), repr(params),
+            repr(options))
+
+
+# sqlite3 authorizer callback adding the tables touched by `actions` to
+# the set `tables`
+def table_recorder(actions, tables):
+    def authorizer(action, arg1, arg2, db_name, source):
+        if action in actions and arg1:
+            tables.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+    return authorizer
+
+
+# Records the tables touched by `actions` while the block runs. Pooled
+# connections track tables with their own long-lived authorizer; on other
+# connections an authorizer is installed for the block (which re-prepares
+# cached statements, so every statement in the block is seen)
+@contextmanager
+def track_tables(conn, actions):
+    record_tables = getattr(conn, 'record_tables', None)
+    if record_tables is not None:
+        with record_tables(actions) as tables:
+            yield tables
+        return
+    tables = set()
+    conn.set_authorizer(table_recorder(actions, tables))
+    try:
+        yield tables
+    finally:
+        conn.set_authorizer(None)
+
+
+# Thread-safe LRU cache of query results with a per-entry TTL; every
+# entry remembers the tables it read so writes can invalidate it.
+# Results are copied in and out, so callers cannot change a cached list.
+# A result read before a write committed must not be stored after the
+# write invalidated its tables: callers take generation() before running
+# the query and pass it to put(), which then drops the stale result.
+class QueryCache:
+    def __init__(self, max_size=128, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (result, tables, expires)
+        self._generation = 0            # bumped by every invalidation
+        self._invalidated = {}          # table -> generation it was dropped
+        self._cleared = 0               # generation of the last clear()
+        self._lock = threading.Lock()
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.copy(entry[0]), True
+
+    # Returns False (and stores nothing) when a table in `tables` was
+    # invalidated after `generation`
+    def put(self, key, result, tables=(), ttl=None, generation=None):
+        ttl = self.ttl if ttl is None else ttl
+        tables = frozenset(table.lower() for table in tables)
+        with self._lock:
+            if generation is not None and (
+                    self._cleared > generation or
+                    any(self._invalidated.get(table, 0) > generation
+                        for table in tables)):
+                return False
+            self._entries[key] = (copy.copy(result), tables,
+                                  time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate_tables(self, tables):
+        tables = {table.lower() for table in tables}
+        if not tables:
+            return 0
+        with self._lock:
+            self._generation += 1
+            for table in tables:
+                self._invalidated[table] = self._generation
+            stale = [key for key, (_, read, _) in self._entries.items()
+                     if read & tables]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cleared = self._generation
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entries), "max_size": self.max_size}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache shared by cache_query and transactional
+query_cache = QueryCache()
@@ -0,0 +1,94 @@
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+# Structured query log: the calling thread only builds a small dict and
+# puts it on a queue; a QueueListener thread formats and writes it
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {"ts": round(record.created, 6), "level": record.levelname}
+        entry.update(getattr(record, "query", {}))
+        return json.dumps(entry, default=str)
+
+
+logger = logging.getLogger("query_log")
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+_queue = queue.SimpleQueue()
+_listener = None
+_lock = threading.Lock()
+
+
+# Starts the background writer (once) sending records to `handler`,
+# stderr by default
+def configure(handler=None):
+    with _lock:
+        _start(handler)
+
+
+# Called with _lock held
+def _start(handler):
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    if handler is None:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    if not logger.handlers:
+        logger.addHandler(logging.handlers.QueueHandler(_queue))
+    _listener = logging.handlers.QueueListener(_queue, handler)
+    _listener.start()
+
+
+# Flushes queued records and stops the writer thread
+def shutdown():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown)
+
+
+# Short stable hash of the bound parameters, so values are not logged
+def fingerprint(params):
+    if not params:
+        return None
+    return hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+
+
+# Queues one record; `error` is the exception the query raised, if any.
+# `status` defaults to "ok" or "error"; a cancelled call passes
+# "cancelled" and is not logged as an error.
+def log_query(query, params, duration_ms, rows, slow=False, error=None,
+              status=None):
+    if _listener is None:
+        with _lock:
+            if _listener is None:
+                _start(None)
+    if error is not None:
+        level = logging.ERROR
+    else:
+        level = logging.WARNING if slow else logging.INFO
+    logger.log(level, "query", extra={
+        "query": {
+            "query": query,
+            "params": fingerprint(params),
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "slow": slow,
+            "status": status or ("ok" if error is None else "error"),
+            "error": None if error is None else
+            f"{type(error).__name__}: {error}",
+        }
+    })
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Unit tests for the statement cache statistics of connection_pool."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from connection_pool import ConnectionPool
+from query_cache import query_cache
+
+cache_query = __import__('4-cache_query').cache_query
+transactional = __import__('2-transactional').transactional
+
+
+@transactional
+def update_email(conn, user_id, email):
+    """Updates one user's email."""
+    conn.execute("UPDATE users SET email = ? WHERE id = ?", (email, user_id))
+
+
+@cache_query
+def fetch_email(conn, query, user_id):
+    """Returns one user's email rows."""
+    return conn.execute(query, (user_id,)).fetchall()
+
+
+class TestStatementStats(unittest.TestCase):
+    """Tests that statement hits are only counted for statements SQLite
+    really reused."""
+
+    def setUp(self) -> None:
+        """Creates a users table in a temporary sqlite file."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "users.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, "
+                     "email TEXT)")
+        conn.execute("INSERT INTO users VALUES (1, 'a@example.com')")
+        conn.commit()
+        conn.close()
+        query_cache.clear()
+        self.addCleanup(query_cache.clear)
+
+    def acquire(self, **options) -> sqlite3.Connection:
+        """Returns a connection of a new pool, released on cleanup."""
+        pool = ConnectionPool(self.db_path, **options)
+        self.addCleanup(pool.close)
+        conn = pool.acquire()
+        self.addCleanup(pool.release, conn)
+        return conn
+
+    def stats(self, conn: sqlite3.Connection) -> tuple:
+        """Returns the (hits, misses) of the connection."""
+        return conn.stats.hits, conn.stats.misses
+
+    def test_reused_statement(self) -> None:
+        """Test a repeated statement is compiled once."""
+        conn = self.acquire()
+        for _ in range(3):
+            conn.execute("SELECT * FROM users WHERE id = ?", (1,))
+        self.assertEqual(self.stats(conn), (2, 1))
+
+    def test_evicted_statement(self) -> None:
+        """Test a statement pushed out of the cache counts as a miss."""
+        conn = self.acquire(statement_cache_size=1)
+        for query in ("SELECT id FROM users", "SELECT email FROM users",
+                      "SELECT id FROM users"):
+            conn.execute(query).fetchall()
+        self.assertEqual(self.stats(conn), (0, 3))
+
+    def test_schema_change_recompiles(self) -> None:
+        """Test a statement recompiled after a schema change is a miss."""
+        conn = self.acquire()
+        conn.execute("SELECT email FROM users").fetchall()
+        other = sqlite3.connect(self.db_path)
+        other.execute("CREATE INDEX users_email ON users (email)")
+        other.close()
+        conn.execute("SELECT email FROM users").fetchall()
+        self.assertEqual(self.stats(conn), (0, 2))
+
+    def test_transactional_reuses_statement(self) -> None:
+        """Test table tracking does not expire compiled statements."""
+        conn = self.acquire()
+        for i in range(3):
+            update_email(conn, 1, f"{i}@example.com")
+        self.assertEqual(self.stats(conn), (2, 1))
+
+    def test_reused_statement_invalidates(self) -> None:
+        """Test writes through a reused statement still invalidate
+        cached reads, and cached reads reuse their statement."""
+        conn = self.acquire()
+        query = "SELECT email FROM users WHERE id = ?"
+        update_email(conn, 1, "b@example.com")
+        self.assertEqual(fetch_email(conn, query, 1), [("b@example.com",)])
+        update_email(conn, 1, "c@example.com")
+        self.assertEqual(fetch_email(conn, query, 1), [("c@example.com",)])
+        self.assertEqual(self.stats(conn), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Unit tests for QueryCache and the cache_query decorator."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from query_cache import QueryCache, query_cache, normalize_query
+
+cache_query = __import__('4-cache_query').cache_query
+transactional = __import__('2-transactional').transactional
+
+
+class TestNormalizeQuery(unittest.TestCase):
+    """Tests for normalize_query."""
+
+    def test_whitespace_outside_literals(self) -> None:
+        """Test formatting differences share one normalised query."""
+        self.assertEqual(normalize_query("SELECT *\n  FROM users ;"),
+                         "SELECT * FROM users")
+
+    def test_whitespace_inside_literals_kept(self) -> None:
+        """Test string literals are left untouched."""
+        self.assertNotEqual(
+            normalize_query("SELECT * FROM users WHERE name = 'John  Smith'"),
+            normalize_query("SELECT * FROM users WHERE name = 'John Smith'"))
+
+
+class TestQueryCache(unittest.TestCase):
+    """Tests for QueryCache."""
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used entry is evicted first."""
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(cache.get("a"), (1, True))
+        self.assertEqual(cache.get("b"), (None, False))
+        self.assertEqual(cache.get("c"), (3, True))
+
+    def test_ttl(self) -> None:
+        """Test entries expire after their TTL."""
+        cache = QueryCache(ttl=10)
+        with patch("query_cache.time.monotonic", return_value=100.0):
+            cache.put("a", 1)
+            cache.put("b", 2, ttl=60)
+        with patch("query_cache.time.monotonic", return_value=120.0):
+            self.assertEqual(cache.get("a"), (None, False))
+            self.assertEqual(cache.get("b"), (2, True))
+
+    def test_invalidate_tables(self) -> None:
+        """Test only the entries that read a written table are dropped."""
+        cache = QueryCache()
+        cache.put("users", 1, {"Users"})
+        cache.put("orders", 2, {"orders"})
+        self.assertEqual(cache.invalidate_tables({"USERS"}), 1)
+        self.assertEqual(cache.get("users"), (None, False))
+        self.assertEqual(cache.get("orders"), (2, True))
+
+    def test_put_after_invalidation_skipped(self) -> None:
+        """Test a result read before an invalidation is not stored."""
+        cache = QueryCache()
+        generation = cache.generation()
+        cache.invalidate_tables({"users"})
+        self.assertFalse(cache.put("users", 1, {"users"}, None, generation))
+        self.assertTrue(cache.put("orders", 2, {"orders"}, None, generation))
+        self.assertEqual(cache.get("users"), (None, False))
+        self.assertEqual(cache.get("orders"), (2, True))
+
+    def test_results_copied(self) -> None:
+        """Test callers cannot change a cached result."""
+        cache = QueryCache()
+        rows = [(1, "a")]
+        cache.put("key", rows)
+        rows.append((2, "b"))
+        cached, _ = cache.get("key")
+        cached.append((3, "c"))
+        self.assertEqual(cache.get("key"), ([(1, "a")], True))
+
+
+class TestCacheQuery(unittest.TestCase):
+    """Tests for cache_query on a temporary sqlite file."""
+
+    def setUp(self) -> None:
+        """Creates a users table in a temporary sqlite file."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.conn = sqlite3.connect(os.path.join(tmp.name, "users.db"))
+        self.addCleanup(self.conn.close)
+        self.conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, "
+                          "email TEXT)")
+        self.conn.execute("INSERT INTO users VALUES (1, 'a@example.com')")
+        self.conn.commit()
+        query_cache.clear()
+        self.addCleanup(query_cache.clear)
+
+    def test_write_invalidates(self) -> None:
+        """Test a transactional write drops the cached read."""
+        @cache_query
+        def fetch(conn, query):
+            return conn.execute(query).fetchall()
+
+        @transactional
+        def update_email(conn, email):
+            conn.execute("UPDATE users SET email = ? WHERE id = 1", (email,))
+
+        query = "SELECT email FROM users"
+        self.assertEqual(fetch(self.conn, query), [("a@example.com",)])
+        update_email(self.conn, "b@example.com")
+        self.assertEqual(fetch(self.conn, query), [("b@example.com",)])
+
+    def test_concurrent_write_not_cached(self) -> None:
+        """Test a result read while a write invalidated its table is
+        returned but not cached."""
+        cache = QueryCache()
+        calls = []
+
+        @cache_query(cache=cache)
+        def fetch(conn, query):
+            calls.append(query)
+            rows = conn.execute(query).fetchall()
+            cache.invalidate_tables({"users"})  # a write commits meanwhile
+            return rows
+
+        fetch(self.conn, "SELECT email FROM users")
+        fetch(self.conn, "SELECT email FROM users")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for the group commit writer of 2-transactional."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+transactional = __import__('2-transactional')
+GroupCommitter = transactional.GroupCommitter
+
+
+def insert(conn, user_id, sql="INSERT INTO users (id) VALUES (?)"):
+    """Inserts one user id."""
+    conn.execute(sql, (user_id,))
+    return user_id
+
+
+def insert_or_rollback(conn, user_id):
+    """Inserts one user id, dropping the whole transaction on conflict."""
+    return insert(conn, user_id, "INSERT OR ROLLBACK INTO users (id) "
+                                 "VALUES (?)")
+
+
+class TestGroupCommitter(unittest.TestCase):
+    """Tests for GroupCommitter."""
+
+    def setUp(self) -> None:
+        """Creates a users table in a temporary sqlite file."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "users.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+        conn.close()
+        self.committer = GroupCommitter(self.db_path, window=0.05)
+        self.addCleanup(self.committer.close)
+
+    def ids(self):
+        """Returns the committed user ids."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [row[0] for row in
+                    conn.execute("SELECT id FROM users ORDER BY id")]
+        finally:
+            conn.close()
+
+    def test_failed_call_rolled_back_alone(self) -> None:
+        """Test a failing call does not undo the rest of its batch."""
+        first = self.committer.submit(insert, (1,), {})
+        duplicate = self.committer.submit(insert, (1,), {})
+        second = self.committer.submit(insert, (2,), {})
+        self.assertEqual(first.result(timeout=5), 1)
+        self.assertRaises(sqlite3.IntegrityError, duplicate.result, 5)
+        self.assertEqual(second.result(timeout=5), 2)
+        self.assertEqual(self.ids(), [1, 2])
+
+    def test_whole_transaction_rolled_back(self) -> None:
+        """Test INSERT OR ROLLBACK resolves every future and the writer
+        keeps running."""
+        first = self.committer.submit(insert, (1,), {})
+        conflict = self.committer.submit(insert_or_rollback, (1,), {})
+        after = self.committer.submit(insert, (2,), {})
+        self.assertRaises(sqlite3.IntegrityError, first.result, 5)
+        self.assertRaises(sqlite3.IntegrityError, conflict.result, 5)
+        self.assertEqual(after.result(timeout=5), 2)
+
+        later = self.committer.submit(insert, (3,), {})
+        self.assertEqual(later.result(timeout=5), 3)
+        self.assertEqual(self.ids(), [2, 3])
+
+
+class TestGetCommitter(unittest.TestCase):
+    """Tests for get_committer."""
+
+    def test_keyed_on_options(self) -> None:
+        """Test decorators with different settings on one database get
+        their own committer, and equal settings share one."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = os.path.join(tmp.name, "users.db")
+        fast = transactional.get_committer(db_path, window=0.001,
+                                           max_batch=10)
+        slow = transactional.get_committer(db_path, window=0.05,
+                                           max_batch=10)
+        for committer in (fast, slow):
+            self.addCleanup(committer.close)
+        self.addCleanup(transactional._committers.clear)
+
+        self.assertIsNot(fast, slow)
+        self.assertEqual((fast.window, slow.window), (0.001, 0.05))
+        self.assertIs(transactional.get_committer(db_path, max_batch=10,
+                                                  window=0.05), slow)
+
+
+if __name__ == "__main__":
+    unittest.main()
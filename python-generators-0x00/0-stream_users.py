@@ -1,15 +1,34 @@
-import sqlite3  # Or use another DB connector like mysql.connector or psycopg2
+#!/usr/bin/python3
 
-def stream_users():
-    conn = sqlite3.connect('your_database.db')  # Replace with your DB
-    cursor = conn.cursor()
+import seed
 
-    cursor.execute("SELECT * FROM user_data")
 
-    for row in cursor:
-        yield row  # Yields one row at a time
+def stream_users(chunk_size=1000, server_side=True, table="user_data"):
+    """
+    Generator that yields user rows one at a time from the user_data table.
 
-    cursor.close()
-    conn.close()
-for user in stream_users():
-    print(user)
+    With server_side=True the rows are read through an unbuffered cursor
+    chunk_size rows at a time, so only one chunk is held in client memory
+    and the first row is available as soon as the server sends it.
+    With server_side=False the whole result set is buffered client side
+    before the first row is yielded.
+    """
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor(buffered=not server_side)
+    try:
+        cursor.execute(f"SELECT user_id, name, email, age FROM {table};")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row  # Yields one row at a time
+    finally:
+        # Closing the connection (not the cursor) discards any rows an
+        # unbuffered cursor has not read yet when the consumer stops early
+        connection.close()
+
+
+if __name__ == "__main__":
+    for user in stream_users():
+        print(user)
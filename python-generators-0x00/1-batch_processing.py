@@ -2,14 +2,24 @@
 
 import seed
 
-def stream_users_in_batches(batch_size):
+MIN_AGE = 25
+
+
+def stream_users_in_batches(batch_size, min_age=None):
     """
     Generator that yields user rows in batches from the user_data table.
     Each batch is a list of rows, where each row is a tuple.
+    When min_age is given only users older than min_age are selected,
+    so the filter runs in the database instead of in Python.
     """
     connection = seed.connect_to_prodev()
     cursor = connection.cursor()
-    cursor.execute("SELECT user_id, name, email, age FROM user_data;")
+    if min_age is None:
+        cursor.execute("SELECT user_id, name, email, age FROM user_data;")
+    else:
+        cursor.execute(
+            "SELECT user_id, name, email, age FROM user_data WHERE age > %s;",
+            (min_age,))
 
     while True:
         batch = cursor.fetchmany(batch_size)
@@ -21,19 +31,35 @@ def stream_users_in_batches(batch_size):
     connection.close()
 
 
-def batch_processing(batch_size):
+def filtered_batches(batch_size, min_age=MIN_AGE, pushdown=True):
+    """
+    Generator that yields batches of users over min_age.
+    With pushdown=True the database does the filtering and only matching
+    rows are sent; with pushdown=False every row is fetched and filtered
+    here, batch by batch.
+    """
+    if pushdown:
+        yield from stream_users_in_batches(batch_size, min_age=min_age)
+        return
+
+    for batch in stream_users_in_batches(batch_size):
+        filtered = [user for user in batch if float(user[3]) > min_age]  # age is at index 3
+        if filtered:
+            yield filtered
+
+
+def batch_processing(batch_size, pushdown=True):
     """
     Processes batches of users, filters those over age 25,
     and returns a list of all such users.
     """
     filtered_users = []
-    for batch in stream_users_in_batches(batch_size):
-        filtered = [user for user in batch if float(user[3]) > 25]  # age is at index 3
-        filtered_users.extend(filtered)
+    for batch in filtered_batches(batch_size, pushdown=pushdown):
+        filtered_users.extend(batch)
     return filtered_users
 
 
 if __name__ == "__main__":
-    result = batch_processing(10)
-    for user in result:
-        print(user)
+    for batch in filtered_batches(10):
+        for user in batch:
+            print(user)
@@ -1,21 +1,57 @@
+#!/usr/bin/python3
+import sys
+
 seed = __import__('seed')
 
 
 def paginate_users(page_size, offset):
+    """
+    Fetches one page of users using LIMIT/OFFSET on a new connection.
+    Kept for callers that need random access to a page by number.
+    """
     connection = seed.connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
+    cursor.execute(
+        "SELECT * FROM user_data ORDER BY user_id LIMIT %s OFFSET %s",
+        (page_size, offset))
     rows = cursor.fetchall()
     connection.close()
     return rows
-import sys
-lazy_paginator = __import__('2-lazy_paginate').lazy_pagination
 
 
-try:
-    for page in lazy_paginator(100):
-        for user in page:
-            print(user)
+def lazy_pagination(page_size):
+    """
+    Generator that lazily yields pages of users, page_size rows at a time.
+
+    Pages are fetched with keyset (seek) pagination on user_id over a
+    single connection: each query starts right after the last user_id
+    of the previous page, so a deep page costs the same as the first one.
+    """
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT * FROM user_data ORDER BY user_id LIMIT %s",
+                       (page_size,))
+        page = cursor.fetchall()
+        while page:
+            yield page
+            if len(page) < page_size:
+                break
+            cursor.execute(
+                "SELECT * FROM user_data WHERE user_id > %s "
+                "ORDER BY user_id LIMIT %s",
+                (page[-1]["user_id"], page_size))
+            page = cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    try:
+        for page in lazy_pagination(100):
+            for user in page:
+                print(user)
 
-except BrokenPipeError:
-    sys.stderr.close()
\ No newline at end of file
+    except BrokenPipeError:
+        sys.stderr.close()
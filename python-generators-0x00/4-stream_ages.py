@@ -2,6 +2,7 @@
 
 import seed
 
+
 def stream_user_ages():
     """
     Generator that yields user ages one at a time from the database.
@@ -9,7 +10,7 @@ def stream_user_ages():
     connection = seed.connect_to_prodev()
     cursor = connection.cursor()
     cursor.execute("SELECT age FROM user_data;")
-    
+
     for (age,) in cursor:
         yield float(age)  # Convert DECIMAL to float for averaging
 
@@ -17,22 +18,54 @@ def stream_user_ages():
     connection.close()
 
 
-def calculate_average_age():
+def aggregate_ages(percentiles=()):
     """
-    Calculates and prints the average age using the generator.
+    Computes age statistics in the database with a single query.
+    Returns a dict with count, sum, avg, min and max, plus a
+    "percentiles" dict mapping each requested fraction (e.g. 0.5) to the
+    nearest-rank age. Only the aggregated row is sent back to the client.
     """
-    total_age = 0
-    count = 0
+    columns = ["COUNT(age)", "SUM(age)", "AVG(age)", "MIN(age)", "MAX(age)"]
+    source = "user_data"
+    params = []
+    if percentiles:
+        columns += ["MIN(CASE WHEN cd >= %s THEN age END)"] * len(percentiles)
+        source = ("(SELECT age, CUME_DIST() OVER (ORDER BY age) AS cd "
+                  "FROM user_data) AS ranked")
+        params = [float(p) for p in percentiles]
 
-    for age in stream_user_ages():
-        total_age += age
-        count += 1
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {source};", params)
+    row = cursor.fetchone()
+    cursor.close()
+    connection.close()
+
+    values = [None if value is None else float(value) for value in row[1:]]
+    stats = dict(zip(("sum", "avg", "min", "max"), values[:4]))
+    stats["count"] = int(row[0])
+    stats["percentiles"] = dict(zip(percentiles, values[4:]))
+    return stats
+
+
+def calculate_average_age(reducer=None):
+    """
+    Calculates and prints the average age.
+    The average is computed by the database; when a custom reducer is
+    given it is called with the stream_user_ages() generator instead and
+    its result is printed.
+    """
+    if reducer is not None:
+        result = reducer(stream_user_ages())
+        print(f"Reduced age of users: {result}")
+        return result
 
-    if count == 0:
+    stats = aggregate_ages()
+    if stats["count"] == 0:
         print("No users found.")
     else:
-        average = total_age / count
-        print(f"Average age of users: {average:.2f}")
+        print(f"Average age of users: {stats['avg']:.2f}")
+    return stats["avg"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Memory/latency benchmark for stream_users.
+
+Fills a user_data_bench table with the rows of user_data.csv repeated
+SCALE times (each copy gets fresh user_ids), then streams it once with
+the buffered cursor and once with the server-side cursor, reporting
+time to first row, total time and peak Python memory for each mode.
+
+Usage: ./benchmark_stream_users.py [scale] [chunk_size]
+"""
+import csv
+import sys
+import time
+import tracemalloc
+import uuid
+
+import seed
+
+stream_users = __import__('0-stream_users').stream_users
+
+BENCH_TABLE = "user_data_bench"
+
+
+def fill_bench_table(connection, csv_file, scale):
+    """
+    Creates BENCH_TABLE like user_data and inserts the csv rows scale times.
+    """
+    with open(csv_file, newline="") as f:
+        rows = [(row["name"], row["email"], row["age"])
+                for row in csv.DictReader(f)]
+
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    cursor.execute(f"CREATE TABLE {BENCH_TABLE} LIKE user_data;")
+    query = (f"INSERT INTO {BENCH_TABLE} (user_id, name, email, age) "
+             "VALUES (%s, %s, %s, %s)")
+    for _ in range(scale):
+        cursor.executemany(
+            query, [(str(uuid.uuid4()),) + row for row in rows])
+        connection.commit()
+    cursor.close()
+    return len(rows) * scale
+
+
+def run(server_side, chunk_size):
+    """
+    Streams BENCH_TABLE once and returns (first_row_s, total_s, peak_bytes).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_row = None
+    for _ in stream_users(chunk_size=chunk_size, server_side=server_side,
+                          table=BENCH_TABLE):
+        if first_row is None:
+            first_row = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_row or 0.0, total, peak
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    connection = seed.connect_to_prodev()
+    count = fill_bench_table(connection, "user_data.csv", scale)
+    connection.close()
+    print(f"{BENCH_TABLE}: {count} rows, chunk_size={chunk_size}")
+
+    for label, server_side in (("server-side", True), ("buffered", False)):
+        first_row, total, peak = run(server_side, chunk_size)
+        print(f"{label:>12}: first row {first_row * 1000:8.2f} ms, "
+              f"total {total:7.2f} s, peak {peak / 1024 / 1024:8.2f} MiB")
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Resumable, checkpointed streaming of user_data.
+
+Batches are read in user_id order with one keyset query each (user_id
+greater than the previous batch's last key), so no result set stays open
+on the server while the consumer works. Once the consumer asks for the
+next batch, the last user_id of the finished batch is saved in a local
+SQLite file under a job name. Restarting the same job resumes right
+after that key instead of from the first row.
+"""
+import sqlite3
+
+import seed
+
+CHECKPOINT_DB = "checkpoints.db"
+
+
+class Checkpoint:
+    """
+    Stores the last completed user_id per job in a SQLite file.
+    """
+
+    def __init__(self, job, path=CHECKPOINT_DB):
+        self.job = job
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS checkpoints "
+                          "(job TEXT PRIMARY KEY, last_key TEXT NOT NULL)")
+        self.conn.commit()
+
+    def load(self):
+        """
+        Returns the last saved key for the job, or None.
+        """
+        row = self.conn.execute(
+            "SELECT last_key FROM checkpoints WHERE job = ?",
+            (self.job,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, key):
+        """
+        Records key as the last completed key for the job.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (job, last_key) VALUES (?, ?)",
+            (self.job, key))
+        self.conn.commit()
+
+    def clear(self):
+        """
+        Forgets the job, so the next run starts from the beginning.
+        """
+        self.conn.execute("DELETE FROM checkpoints WHERE job = ?",
+                          (self.job,))
+        self.conn.commit()
+
+    def close(self):
+        """
+        Closes the checkpoint database.
+        """
+        self.conn.close()
+
+
+def resumable_batches(job, batch_size, path=CHECKPOINT_DB):
+    """
+    Generator that yields user rows in batches, resuming job from its
+    last checkpoint. A batch is checkpointed when the next one is
+    requested, so a batch the consumer was still processing when the
+    job died is emitted again on restart. The checkpoint is cleared once
+    the whole table has been streamed.
+    """
+    checkpoint = Checkpoint(job, path)
+    last_key = checkpoint.load()
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    try:
+        while True:
+            if last_key is None:
+                cursor.execute("SELECT user_id, name, email, age "
+                               "FROM user_data ORDER BY user_id LIMIT %s;",
+                               (batch_size,))
+            else:
+                cursor.execute("SELECT user_id, name, email, age "
+                               "FROM user_data WHERE user_id > %s "
+                               "ORDER BY user_id LIMIT %s;",
+                               (last_key, batch_size))
+            batch = cursor.fetchall()
+            if not batch:
+                break
+            yield batch
+            last_key = batch[-1][0]  # user_id is at index 0
+            checkpoint.save(last_key)
+            if len(batch) < batch_size:
+                break
+        checkpoint.clear()
+    finally:
+        cursor.close()
+        connection.close()
+        checkpoint.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    job = sys.argv[1] if len(sys.argv) > 1 else "user_export"
+    for batch in resumable_batches(job, 100):
+        for user in batch:
+            print(user)
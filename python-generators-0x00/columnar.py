@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""
+Columnar NumPy reader for user_data.
+
+Rows are fetched with fetchmany and turned into NumPy arrays one batch
+at a time, so filters and statistics run as array operations instead
+of a Python loop over tuples.
+"""
+import numpy as np
+
+ID_DTYPE = "S36"  # user_id is a CHAR(36) uuid
+
+
+def to_columns(rows):
+    """
+    Converts a list of (user_id, name, email, age) tuples into a dict of
+    columns: user_id as fixed-width bytes, name and email as object
+    arrays and age as float64.
+    """
+    user_ids, names, emails, ages = zip(*rows) if rows else ((),) * 4
+    return {
+        "user_id": np.array([u.encode() for u in user_ids], dtype=ID_DTYPE),
+        "name": np.array(names, dtype=object),
+        "email": np.array(emails, dtype=object),
+        "age": np.array(ages, dtype=np.float64),
+    }
+
+
+def stream_columns(batch_size=10000, min_age=None):
+    """
+    Generator that yields user_data in batches of at most batch_size rows,
+    each batch as a dict of NumPy columns (see to_columns).
+    When min_age is given the age > min_age filter runs in the database.
+    """
+    stream_users_in_batches = __import__(
+        '1-batch_processing').stream_users_in_batches
+    for batch in stream_users_in_batches(batch_size, min_age=min_age):
+        yield to_columns(batch)
+
+
+def filter_columns(columns, mask):
+    """
+    Returns a new dict of columns keeping only the rows where mask is True.
+    """
+    return {name: column[mask] for name, column in columns.items()}
+
+
+def filter_by_age(columns, min_age=25):
+    """
+    Returns the rows of columns with age strictly greater than min_age.
+    """
+    return filter_columns(columns, columns["age"] > min_age)
+
+
+def partial_age_stats(ages):
+    """
+    Returns count, sum, min and max of an age array as a dict that can be
+    combined with merge_age_stats.
+    """
+    if ages.size == 0:
+        return {"count": 0, "sum": 0.0, "min": None, "max": None}
+    return {
+        "count": int(ages.size),
+        "sum": float(ages.sum()),
+        "min": float(ages.min()),
+        "max": float(ages.max()),
+    }
+
+
+def merge_age_stats(stats):
+    """
+    Combines partial_age_stats results into one dict, adding "avg".
+    """
+    merged = {"count": 0, "sum": 0.0, "min": None, "max": None}
+    for part in stats:
+        if not part["count"]:
+            continue
+        merged["count"] += part["count"]
+        merged["sum"] += part["sum"]
+        if merged["min"] is None or part["min"] < merged["min"]:
+            merged["min"] = part["min"]
+        if merged["max"] is None or part["max"] > merged["max"]:
+            merged["max"] = part["max"]
+    merged["avg"] = (merged["sum"] / merged["count"]
+                     if merged["count"] else None)
+    return merged
+
+
+def age_stats(batch_size=10000, min_age=None):
+    """
+    Computes count/sum/avg/min/max of ages one NumPy batch at a time.
+    """
+    return merge_age_stats(
+        partial_age_stats(columns["age"])
+        for columns in stream_columns(batch_size, min_age=min_age))
+
+
+if __name__ == "__main__":
+    stats = age_stats()
+    if stats["count"] == 0:
+        print("No users found.")
+    else:
+        print(f"Average age of users: {stats['avg']:.2f} "
+              f"(min {stats['min']:.0f}, max {stats['max']:.0f}, "
+              f"{stats['count']} users)")
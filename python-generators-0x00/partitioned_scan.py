@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""
+Parallel range-partitioned scan of user_data.
+
+seed gives every user a random uuid4 user_id, so splitting its hex key
+space into equal ranges gives partitions of roughly equal size; for
+other key distributions the bounds can be sampled from the table
+instead. Each partition is streamed on its own connection in a worker
+process, and only the per-batch results (filtered rows or partial
+aggregates) travel back to the parent, one batch at a time through a
+bounded queue.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import seed
+
+KEY_SPACE = 16 ** 4  # number of distinct 4 hex digit user_id prefixes
+
+
+def key_ranges(partitions, sampled=False):
+    """
+    Splits user_data into partitions (lower, upper) user_id ranges.
+    lower is inclusive, upper exclusive; None means unbounded.
+
+    By default the uuid4 hex key space is split evenly. With sampled,
+    the bounds are the user_ids found at every len/partitions-th
+    position of the primary key index (one COUNT(*) and one
+    LIMIT 1 OFFSET lookup per bound), so partitions hold about the
+    same number of rows whatever the keys; small tables can give
+    fewer ranges.
+    """
+    if not sampled:
+        bounds = [format(i * KEY_SPACE // partitions, "04x")
+                  for i in range(1, partitions)]
+        return list(zip([None] + bounds, bounds + [None]))
+
+    connection = seed.connect_to_prodev()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM user_data;")
+        count = cursor.fetchone()[0]
+        bounds = []
+        for i in range(1, partitions):
+            cursor.execute("SELECT user_id FROM user_data ORDER BY user_id "
+                           "LIMIT 1 OFFSET %s;", (i * count // partitions,))
+            row = cursor.fetchone()
+            if row and (not bounds or row[0] > bounds[-1]):
+                bounds.append(row[0])
+    finally:
+        cursor.close()
+        connection.close()
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def scan_partition(key_range, func, results, batch_size=1000, min_age=None):
+    """
+    Streams the rows of one key range in batches on its own connection
+    and puts (func(batch),) on the results queue for each batch, then
+    None once the range is done (or failed).
+    """
+    lower, upper = key_range
+    conditions, params = [], []
+    if lower is not None:
+        conditions.append("user_id >= %s")
+        params.append(lower)
+    if upper is not None:
+        conditions.append("user_id < %s")
+        params.append(upper)
+    if min_age is not None:
+        conditions.append("age > %s")
+        params.append(min_age)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    try:
+        connection = seed.connect_to_prodev()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT user_id, name, email, age FROM user_data{where};",
+                params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                results.put((func(batch),))
+        finally:
+            cursor.close()
+            connection.close()
+    finally:
+        results.put(None)
+
+
+def partitioned_scan(func, partitions=None, batch_size=1000, min_age=None,
+                     sampled=False):
+    """
+    Runs scan_partition over every key range in a process pool and yields
+    func's per-batch results as the workers produce them, interleaved
+    across partitions in no particular order. At most two results per
+    partition wait in the queue, so a slow consumer holds the workers
+    back. Re-raises the first worker error once every partition is done.
+    func must be a module-level function so it can be pickled.
+    """
+    partitions = partitions or os.cpu_count() or 1
+    ranges = key_ranges(partitions, sampled)
+    count = len(ranges)
+    # The manager closes first on exit, so workers blocked on a full
+    # queue fail instead of deadlocking when the consumer stops early
+    with ProcessPoolExecutor(max_workers=count) as executor, \
+            Manager() as manager:
+        results = manager.Queue(maxsize=2 * count)
+        futures = [executor.submit(scan_partition, key_range, func, results,
+                                   batch_size, min_age)
+                   for key_range in ranges]
+        running = count
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+            else:
+                yield item[0]
+        for future in futures:
+            future.result()
+
+
+def keep_rows(batch):
+    """
+    Returns the batch unchanged, for scans that collect rows.
+    """
+    return batch
+
+
+def age_count_sum(batch):
+    """
+    Returns the (count, sum) of ages in a batch as a partial aggregate.
+    """
+    return len(batch), sum(float(user[3]) for user in batch)
+
+
+def parallel_batch_processing(batch_size, min_age=25, partitions=None):
+    """
+    Parallel batch_processing: returns every user over min_age, filtered
+    in the database and read across partitions.
+    """
+    filtered_users = []
+    for batch in partitioned_scan(keep_rows, partitions, batch_size,
+                                  min_age):
+        filtered_users.extend(batch)
+    return filtered_users
+
+
+def parallel_average_age(partitions=None, batch_size=1000):
+    """
+    Parallel calculate_average_age: merges per-partition partial sums.
+    Returns None when the table is empty.
+    """
+    count, total = 0, 0.0
+    for part_count, part_sum in partitioned_scan(age_count_sum, partitions,
+                                                 batch_size):
+        count += part_count
+        total += part_sum
+    return total / count if count else None
+
+
+if __name__ == "__main__":
+    average = parallel_average_age()
+    if average is None:
+        print("No users found.")
+    else:
+        print(f"Average age of users: {average:.2f}")
@@ -1,24 +1,205 @@
 #!/usr/bin/python3
+"""
+Sets up the ALX_prodev MySQL database and seeds user_data from a csv file.
+"""
+import csv
+import os
+import tempfile
+import time
+import uuid
 
-seed = __import__('seed')
+import mysql.connector
+from mysql.connector import errors
 
-connection = seed.connect_db()
-if connection:
-    seed.create_database(connection)
-    connection.close()
-    print(f"connection successful")
+DB_NAME = "ALX_prodev"
+CHUNK_SIZE = 5000
 
-    connection = seed.connect_to_prodev()
 
+def connection_options(**options):
+    """
+    Returns the mysql.connector.connect options for the server named by
+    the MYSQL_HOST, MYSQL_USER and MYSQL_PASSWORD environment variables,
+    updated with options.
+    """
+    return {
+        "host": os.environ.get("MYSQL_HOST", "localhost"),
+        "user": os.environ.get("MYSQL_USER", "root"),
+        "password": os.environ.get("MYSQL_PASSWORD", ""),
+        **options,
+    }
+
+
+def connect_db(**options):
+    """
+    Connects to the MySQL server, returns None on failure.
+    Extra keyword options are passed to mysql.connector.connect.
+    """
+    try:
+        return mysql.connector.connect(**connection_options(**options))
+    except errors.Error as e:
+        print(f"[ERROR] Could not connect to MySQL: {e}")
+        return None
+
+
+def create_database(connection):
+    """
+    Creates the ALX_prodev database if it does not exist.
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME};")
+    cursor.close()
+
+
+def connect_to_prodev(**options):
+    """
+    Connects to the ALX_prodev database, returns None on failure.
+    """
+    connection = connect_db(**options)
     if connection:
-        seed.create_table(connection)
-        seed.insert_data(connection, 'user_data.csv')
+        connection.database = DB_NAME
+    return connection
+
+
+def create_table(connection):
+    """
+    Creates the user_data table if it does not exist.
+    """
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id CHAR(36) NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            age DECIMAL(5, 0) NOT NULL,
+            INDEX (user_id)
+        );
+    """)
+    connection.commit()
+    cursor.close()
+    print("Table user_data created successfully")
+
+
+def read_csv_chunks(data, chunk_size=CHUNK_SIZE):
+    """
+    Generator that yields lists of (user_id, name, email, age) tuples,
+    chunk_size rows at a time, so the csv is never fully in memory.
+    """
+    with open(data, newline="") as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append((str(uuid.uuid4()), row["name"], row["email"],
+                          row["age"]))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def load_data_infile(data, chunk_size=CHUNK_SIZE, **options):
+    """
+    Bulk loads the csv with LOAD DATA LOCAL INFILE in one statement.
+
+    The rows are first copied to a temporary csv with a random uuid4
+    user_id each (MySQL's UUID() is time based, so its ids would not be
+    spread over the key space). The load runs on its own connection,
+    opened with the mysql.connector.connect options given (they must
+    select the target database); it is the only one opened with
+    allow_local_infile, since that option lets the server ask the
+    client for any local file.
+    Returns the number of rows loaded; raises if the server or client
+    does not allow local infile.
+    """
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            writer = csv.writer(f)
+            for chunk in read_csv_chunks(data, chunk_size):
+                writer.writerows(chunk)
+
+        connection = mysql.connector.connect(allow_local_infile=True,
+                                             **options)
+        try:
+            cursor = connection.cursor()
+            # csv.writer doubles quotes but never escapes backslashes
+            cursor.execute(
+                "LOAD DATA LOCAL INFILE %s INTO TABLE user_data "
+                "FIELDS TERMINATED BY ',' ENCLOSED BY '\"' ESCAPED BY '' "
+                "LINES TERMINATED BY '\\r\\n' "
+                "(user_id, name, email, age);",
+                (path,))
+            connection.commit()
+            count = cursor.rowcount
+            cursor.close()
+            return count
+        finally:
+            connection.close()
+    finally:
+        os.unlink(path)
+
+
+def insert_data(connection, data, chunk_size=CHUNK_SIZE,
+                infile_options=None):
+    """
+    Inserts the users from the csv file data into user_data.
+
+    With infile_options, the mysql.connector.connect options of the
+    database connection points at, the csv is bulk loaded with
+    LOAD DATA LOCAL INFILE on a separate connection (see
+    load_data_infile). Otherwise, or when the server does not allow it,
+    the csv is streamed in chunks of chunk_size rows and each chunk is
+    inserted on connection with one executemany in its own transaction.
+    Prints the number of rows inserted and the rows/sec rate.
+    """
+    start = time.perf_counter()
+    count = None
+    if infile_options is not None:
+        try:
+            count = load_data_infile(data, chunk_size, **infile_options)
+        except errors.Error as e:
+            print(f"[WARNING] LOAD DATA LOCAL INFILE unavailable: {e}")
+
+    if count is None:
+        count = 0
         cursor = connection.cursor()
-        cursor.execute(f"SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = 'ALX_prodev';")
-        result = cursor.fetchone()
-        if result:
-            print(f"Database ALX_prodev is present ")
-        cursor.execute(f"SELECT * FROM user_data LIMIT 5;")
-        rows = cursor.fetchall()
-        print(rows)
-        cursor.close()
\ No newline at end of file
+        query = ("INSERT INTO user_data (user_id, name, email, age) "
+                 "VALUES (%s, %s, %s, %s)")
+        for chunk in read_csv_chunks(data, chunk_size):
+            try:
+                cursor.executemany(query, chunk)
+                connection.commit()
+            except errors.Error:
+                connection.rollback()
+                cursor.close()
+                raise
+            count += len(chunk)
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"Inserted {count} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return count
+
+
+if __name__ == "__main__":
+    connection = connect_db()
+    if connection:
+        create_database(connection)
+        connection.close()
+        print(f"connection successful")
+
+        connection = connect_to_prodev()
+
+        if connection:
+            create_table(connection)
+            insert_data(connection, 'user_data.csv',
+                        connection_options(database=DB_NAME))
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = 'ALX_prodev';")
+            result = cursor.fetchone()
+            if result:
+                print(f"Database ALX_prodev is present ")
+            cursor.execute(f"SELECT * FROM user_data LIMIT 5;")
+            rows = cursor.fetchall()
+            print(rows)
+            cursor.close()